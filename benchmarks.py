@@ -0,0 +1,185 @@
+"""benchmarks"""
+from typing import List, Tuple
+from pathlib import Path
+from unittest import mock
+import tempfile
+import hashlib
+import timeit
+import time
+import os
+from kjmarotools import proprietdin
+from kjmarotools.basics import filetools, ostools, walker
+
+
+def _synthetic_conventions(count: int) -> list:
+    """Return <count> conventions (built-in + synthetic sharing 4 prefixes)"""
+    # pylint: disable=protected-access
+    builtins = [x for x in proprietdin._DISPATCHER.engine.conventions
+                if type(x).__module__ == proprietdin.__name__]
+    synthetic = []
+    # registered in a temporary dispatcher (the global one is not modified)
+    with mock.patch.object(proprietdin, "_DISPATCHER",
+                           proprietdin._Dispatcher()):
+        for idx in range(max(count - len(builtins), 0)):
+            din_fmt = f"SRC{idx % 4}_%Y%m%d_%H%M%S_{idx:03d}"
+            prop_class = type(f"Synthetic{idx}",
+                              (proprietdin.PatternProprietary,),
+                              {"_tail": "", "_din_fmt": din_fmt})
+            synthetic.append(prop_class())
+    return (builtins + synthetic)[:count]
+
+
+def proprietary_engine_benchmark():
+    """
+    Cost per filename of the engine vs a linear scan of conventions. The
+    engine cost still grows with the conventions sharing a prefix (they are
+    alternatives of one pattern), but much slower than the linear scan.
+    """
+    names = [Path(x) for x in ("IMG_20210105_010203.jpg", "DSC_0001.JPG",
+                               "WhatsApp Image 2018-09-22 at 18.11.39.jpg",
+                               "PXL_20220101_101010123.jpg", "notes.txt",
+                               "signal-2021-01-02-123456.jpg",
+                               "SRC1_20210105_010203_285.jpg",
+                               "SRC2_20210105_010203_999.jpg")] * 500
+    print(f"{'conventions':>12} {'engine[us]':>11} {'linear[us]':>11}")
+    for count in (3, 10, 30, 100, 300):
+        convs = _synthetic_conventions(count)
+        engine = proprietdin.ProprietaryEngine(convs)
+
+        def linear(file, convs=convs):
+            for conv in convs:
+                if conv.get_din(file).year != 1:
+                    return conv
+            return None
+
+        t_engine = timeit.timeit(
+            lambda match=engine.match: [match(x) for x in names],
+            number=3) / (3 * len(names)) * 1e6
+        t_linear = timeit.timeit(
+            lambda match=linear: [match(x) for x in names],
+            number=3) / (3 * len(names)) * 1e6
+        print(f"{count:>12} {t_engine:>11.2f} {t_linear:>11.2f}")
+
+
+def _legacy_get_folders_tree(base_folder: Path,
+                             filter_scan: Tuple[str, ...] = ()) -> List[Path]:
+    """Copy of the previous 'filetools.get_folders_tree()' (os.walk + glob)"""
+    if not filter_scan:
+        full_tree = [Path(x[0]) for x in os.walk(base_folder)]
+        full_tree.sort()
+        full_tree.pop(full_tree.index(base_folder))
+        return full_tree
+
+    folders2scan = []
+    for kwd in filter_scan:
+        folders2scan += list(base_folder.glob(kwd))
+    folders_tree = [Path(x[0]) for x in os.walk(base_folder)]
+    folders_tree = [x for x in folders_tree if x in folders2scan]
+    folders_tree.sort()
+    full_tree = []
+    for folder in folders_tree:
+        full_tree += [Path(x[0]) for x in os.walk(folder)]
+    full_tree.sort()
+    return full_tree
+
+
+def _synthetic_tree(base: Path, tops=200, subs=10, leafs=5):
+    """Create <tops> x <subs> x <leafs> folders in <base>"""
+    for top in range(tops):
+        for sub in range(subs):
+            for leaf in range(leafs):
+                base.joinpath(f"{top:03d}_top", f"sub{sub}",
+                              f"leaf{leaf}").mkdir(parents=True)
+
+
+def folders_tree_benchmark():
+    """Single scandir pass vs the previous os.walk + glob version"""
+    filters: Tuple[Tuple[str, ...], ...] = ((), ("*1*",), ("00*", "19*"))
+    print(f"{'filter_scan':>16} {'scandir[ms]':>12} {'legacy[ms]':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        _synthetic_tree(base)
+        for filter_scan in filters:
+            legacy = _legacy_get_folders_tree(base, filter_scan)
+            assert filetools.get_folders_tree(base, filter_scan) == legacy
+            t_new = timeit.timeit(
+                lambda x=filter_scan: filetools.get_folders_tree(base, x),
+                number=3) / 3 * 1e3
+            t_legacy = timeit.timeit(
+                lambda x=filter_scan: _legacy_get_folders_tree(base, x),
+                number=3) / 3 * 1e3
+            print(f"{str(filter_scan):>16} {t_new:>12.1f} {t_legacy:>11.1f}")
+
+
+def parallel_walker_benchmark(delay=0.005):
+    """Sequential vs parallel walk with <delay> seconds per 'os.scandir()'"""
+    scandir = os.scandir
+
+    def delayed_scandir(path="."):
+        time.sleep(delay)
+        return scandir(path)
+
+    print(f"{'workers':>8} {'folders[s]':>11} {'files[s]':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        _synthetic_tree(base, tops=20, subs=5, leafs=4)
+        with mock.patch.object(os, "scandir", delayed_scandir):
+            t_start = time.perf_counter()
+            folders = filetools.get_folders_tree(base)
+            t_folders = time.perf_counter() - t_start
+            t_start = time.perf_counter()
+            filetools.get_files_tree(folders)
+            t_files = time.perf_counter() - t_start
+            print(f"{'seq':>8} {t_folders:>11.2f} {t_files:>9.2f}")
+            for workers in (4, 16, 64):
+                t_start = time.perf_counter()
+                walked = walker.get_folders_tree(base, workers=workers)
+                assert walked == folders
+                t_folders = time.perf_counter() - t_start
+                t_start = time.perf_counter()
+                walker.get_files_tree(folders, workers=workers)
+                t_files = time.perf_counter() - t_start
+                print(f"{workers:>8} {t_folders:>11.2f} {t_files:>9.2f}")
+
+
+def _legacy_md5checksum(filepath: Path, buffer=2**20) -> str:
+    """Copy of the previous 'ostools.md5checksum()' (new bytes per read)"""
+    with open(filepath, "rb") as fle:
+        hashmd5 = hashlib.md5()
+        while buff := fle.read(buffer):
+            hashmd5.update(buff)
+        return hashmd5.hexdigest()
+
+
+def checksums_benchmark(size=2**28):
+    """Hashing throughput (GB/s, file in page cache) per buffer and mode"""
+    print(f"{'algorithms':>20} {'buffer':>8} {'read':>6} {'mmap':>6} "
+          f"{'legacy':>7}")
+    with tempfile.NamedTemporaryFile() as tmp:
+        for _ in range(size // 2**24):
+            tmp.write(os.urandom(2**24))
+        tmp.flush()
+        file = Path(tmp.name)
+        for algorithms in (("md5",), ("md5", "sha256", "blake2b")):
+            for buffer in (2**16, 2**20, 2**23):
+                speeds = []
+                for use_mmap in (False, True):
+                    t_hash = timeit.timeit(
+                        lambda x=algorithms, y=buffer, z=use_mmap:
+                        ostools.file_checksums(file, x, y, z), number=2) / 2
+                    speeds.append(size / t_hash / 1e9)
+                legacy = ""
+                if algorithms == ("md5",):
+                    t_hash = timeit.timeit(
+                        lambda y=buffer: _legacy_md5checksum(file, y),
+                        number=2) / 2
+                    legacy = f"{size / t_hash / 1e9:.2f}"
+                print(f"{'+'.join(algorithms):>20} {buffer:>8} "
+                      f"{speeds[0]:>6.2f} {speeds[1]:>6.2f} {legacy:>7}")
+
+
+if __name__ == "__main__":
+    proprietary_engine_benchmark()
+    folders_tree_benchmark()
+    parallel_walker_benchmark()
+    checksums_benchmark()
@@ -0,0 +1,252 @@
+"""asyncio versions of the blocking file tools (hash, stat/utime, move)"""
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from typing import Tuple, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import functools
+import threading
+import datetime
+import asyncio
+import weakref
+
+from .basics import filetools, ostools
+from . import proprietdin
+
+T = TypeVar("T")
+
+
+class FileOpsRunner:
+    """
+    --------------------------------------------------------------------------
+    Runs blocking file operations for asyncio code in a managed pool of
+    <max_workers> threads. Every call waits for one of <limit> slots before
+    being submitted (backpressure): thousands of concurrent requests queue
+    in the event loop instead of opening thousands of files.
+    --------------------------------------------------------------------------
+    - A cancelled call that did not start yet is dropped. A call already
+      running in a thread can not be interrupted: it keeps its slot until
+      it finishes, so the limit always holds.
+    - The slots are counted per event loop.
+    - 'shutdown()' stops accepting new calls but, unless <cancel_futures>,
+      the calls already waiting for a slot are still run.
+    --------------------------------------------------------------------------
+    """
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, max_workers=8, limit: Optional[int] = None):
+        self.max_workers = max_workers
+        self.limit = limit if limit is not None else 2 * max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="kjmaro-aio")
+        self._semaphores: "weakref.WeakKeyDictionary[Any, Any]" = \
+            weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._closed = False
+        self._cancel = False
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Return the slots semaphore of the running event loop"""
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.limit)
+        return self._semaphores[loop]
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run func(*args, **kwargs) in the pool once a slot is free"""
+        semaphore = self._semaphore()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("cannot schedule new calls after shutdown")
+            self._waiting += 1
+        try:
+            await semaphore.acquire()
+            try:
+                with self._lock:
+                    if self._cancel:
+                        raise asyncio.CancelledError()
+                    future = self._executor.submit(
+                        functools.partial(func, *args, **kwargs))
+            except BaseException:
+                semaphore.release()
+                raise
+        finally:
+            self._submitted()
+        loop = asyncio.get_running_loop()
+        future.add_done_callback(
+            lambda _: _call_soon_threadsafe(loop, semaphore.release))
+        return await asyncio.wrap_future(future)
+
+    async def map(self, func: Callable[[Any], T], items: Iterable[Any]
+                  ) -> List[T]:
+        """
+        ----------------------------------------------------------------------
+        Return [func(x) for x in items] run in the pool. At most <limit>
+        tasks exist at once (the items are consumed as slots are freed) and
+        the first error cancels the pending ones.
+        ----------------------------------------------------------------------
+        """
+        results: Dict[int, T] = {}
+        pending: Dict[asyncio.Future, int] = {}
+        try:
+            for idx, item in enumerate(items):
+                if len(pending) >= self.limit:
+                    await _wait_first(pending, results)
+                pending[asyncio.ensure_future(self.run(func, item))] = idx
+            while pending:
+                await _wait_first(pending, results)
+        finally:
+            for task in pending:
+                task.cancel()
+            # retrieve the outcome of the tasks finished meanwhile
+            await asyncio.gather(*pending, return_exceptions=True)
+        return [results[x] for x in range(len(results))]
+
+    def _submitted(self):
+        """Count a call out of the wait (the last one stops a closed pool)"""
+        with self._lock:
+            self._waiting -= 1
+            stop = self._closed and not self._cancel and not self._waiting
+        if stop:
+            self._executor.shutdown(wait=False)
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        """
+        ----------------------------------------------------------------------
+        Stop accepting new calls and stop the pool once the calls waiting for
+        a slot are submitted.
+        - wait: block until the submitted calls end (not possible while calls
+                are waiting for a slot, as they need the event loop: the
+                last of them stops the pool without waiting)
+        - cancel_futures: cancel the calls waiting for a slot and the ones
+                          submitted but not started
+        ----------------------------------------------------------------------
+        """
+        with self._lock:
+            self._closed = True
+            self._cancel = cancel_futures
+            defer = self._waiting and not cancel_futures
+        if not defer:
+            self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+async def _wait_first(pending: Dict[asyncio.Future, int],
+                      results: Dict[int, Any]):
+    """
+    --------------------------------------------------------------------------
+    Wait for the first pending tasks storing their results by index. All
+    the finished tasks are collected before raising the error of the first
+    failed one (lowest index), so no exception is left unretrieved.
+    --------------------------------------------------------------------------
+    """
+    done, _ = await asyncio.wait(pending,
+                                 return_when=asyncio.FIRST_COMPLETED)
+    error: Optional[BaseException] = None
+    for task in sorted(done, key=pending.__getitem__):
+        idx = pending.pop(task)
+        if task.cancelled():
+            error = error or asyncio.CancelledError()
+        elif task.exception() is not None:
+            error = error or task.exception()
+        else:
+            results[idx] = task.result()
+    if error is not None:
+        raise error
+
+
+def _call_soon_threadsafe(loop: asyncio.AbstractEventLoop,
+                          callback: Callable[[], Any]):
+    """Schedule the callback in the loop (ignored if it is closed)"""
+    try:
+        loop.call_soon_threadsafe(callback)
+    except RuntimeError:
+        pass
+
+
+_RUNNER: Optional[FileOpsRunner] = None
+
+
+def get_runner() -> FileOpsRunner:
+    """Return the default runner of the module functions"""
+    global _RUNNER  # pylint: disable=global-statement
+    if _RUNNER is None:
+        _RUNNER = FileOpsRunner()
+    return _RUNNER
+
+
+def configure(max_workers=8, limit: Optional[int] = None):
+    """Replace the default runner (the previous one finishes its calls)"""
+    global _RUNNER  # pylint: disable=global-statement
+    previous, _RUNNER = _RUNNER, FileOpsRunner(max_workers, limit)
+    if previous is not None:
+        previous.shutdown(wait=False)
+
+
+def shutdown(wait=True):
+    """Stop the default runner cancelling the calls not started yet"""
+    global _RUNNER  # pylint: disable=global-statement
+    previous, _RUNNER = _RUNNER, None
+    if previous is not None:
+        previous.shutdown(wait=wait, cancel_futures=True)
+
+
+async def md5checksum(filepath: Path, buffer=2**20) -> str:
+    """async 'ostools.md5checksum()'"""
+    return await get_runner().run(ostools.md5checksum, filepath, buffer)
+
+
+async def file_checksums(filepath: Path,
+                         algorithms: Tuple[str, ...] = ("md5",),
+                         buffer=2**20, use_mmap=False) -> Dict[str, str]:
+    """async 'ostools.file_checksums()'"""
+    return await get_runner().run(ostools.file_checksums, filepath,
+                                  algorithms, buffer, use_mmap)
+
+
+async def stat_times(paths: Iterable[Path]
+                     ) -> List[Optional[ostools.FileTimes]]:
+    """async 'ostools.stat_times()'"""
+    return await get_runner().run(ostools.stat_times, list(paths))
+
+
+async def set_file_times(filepath: Path,
+                         atime: Optional[ostools.DateOrNs] = None,
+                         mtime: Optional[ostools.DateOrNs] = None):
+    """async 'ostools.set_file_times()'"""
+    await get_runner().run(ostools.set_file_times, filepath, atime, mtime)
+
+
+async def set_file_modify_date(filepath: Path, date: datetime.datetime):
+    """async 'ostools.set_file_modify_date()'"""
+    await get_runner().run(ostools.set_file_modify_date, filepath, date)
+
+
+async def rename_noreplace(source: Path, target: Path):
+    """async 'filetools.rename_noreplace()'"""
+    await get_runner().run(filetools.rename_noreplace, source, target)
+
+
+async def rename_proprietary_din_file(file: Path, year_bounds=(1800, 2300)
+                                      ) -> Path:
+    """async 'proprietdin.rename_proprietary_din_file()'"""
+    return await get_runner().run(proprietdin.rename_proprietary_din_file,
+                                  file, year_bounds)
+
+
+async def move_files2destination(files_relative_tree: List[Path],
+                                 src_parent_folder: Path,
+                                 dst_parent_folder: Path,
+                                 **kwargs) -> List[Path]:
+    """async 'filetools.move_files2destination()'"""
+    return await get_runner().run(filetools.move_files2destination,
+                                  files_relative_tree, src_parent_folder,
+                                  dst_parent_folder, **kwargs)
+
+
+async def move_files2destination_batch(files_relative_tree: List[Path],
+                                       src_parent_folder: Path,
+                                       dst_parent_folder: Path, **kwargs
+                                       ) -> filetools.MoveReport:
+    """async 'filetools.move_files2destination_batch()'"""
+    return await get_runner().run(filetools.move_files2destination_batch,
+                                  files_relative_tree, src_parent_folder,
+                                  dst_parent_folder, **kwargs)
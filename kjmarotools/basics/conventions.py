@@ -41,10 +41,16 @@ Files with DIN and Date-To-Review (TRDIN) <[files to be manually reviewed]>
     - eg: 20130502-235959(DTR) test2.jpg
     - ...
 """
-from typing import Tuple
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Tuple
+from typing import Union, TYPE_CHECKING
+from collections import OrderedDict
 from pathlib import Path
+import threading
 import datetime
 
+if TYPE_CHECKING:
+    import numpy
+
 
 def get_folder_kdin_bounds(folder: Path, year_bounds=(1800, 2300)
                            ) -> Tuple[datetime.datetime, datetime.datetime]:
@@ -75,33 +81,69 @@ def get_folder_kdin_bounds(folder: Path, year_bounds=(1800, 2300)
         - YYYY-MM-DD_YYYY-MM-DD abcdefg10
     --------------------------------------------------------------------------
     """
+    return _PARSER_CACHE.parse(_kdin_bounds_from_fields,
+                               folder.name.split()[0].strip(), year_bounds)
+
+
+def get_folders_kdin_bounds_batch(folders: Iterable[Union[Path, str]],
+                                  year_bounds=(1800, 2300)
+                                  ) -> List[Tuple[datetime.datetime,
+                                                  datetime.datetime]]:
+    """
+    --------------------------------------------------------------------------
+    Batch version of 'get_folder_kdin_bounds()' returning the bounds of every
+    folder in the same order. Folders can be given as Path objects or as
+    folder-names (str). Repeated names are only parsed once per batch.
+    --------------------------------------------------------------------------
+    """
+    parsed: Dict[str, Tuple[datetime.datetime, datetime.datetime]] = {}
+    bounds = []
+    for folder in folders:
+        name = folder.name if isinstance(folder, Path) else folder
+        fields = name.split()[0].strip()
+        if fields not in parsed:
+            parsed[fields] = _PARSER_CACHE.parse(_kdin_bounds_from_fields,
+                                                 fields, year_bounds)
+        bounds.append(parsed[fields])
+    return bounds
+
+
+def _kdin_bounds_from_fields(fields: str, year_bounds=(1800, 2300)
+                             ) -> Tuple[datetime.datetime, datetime.datetime]:
+    """
+    --------------------------------------------------------------------------
+    Compute the folder KDIN bounds of the date-fields of the folder-name. The
+    name is classified only once by its length and its number of separators
+    ('-' and '_') and then it goes straight to the only case able to match.
+    --------------------------------------------------------------------------
+    """
     # pylint: disable=too-many-locals, too-many-statements, too-many-branches
-    fields = folder.name.split()[0].strip()
-    date0 = datetime.datetime(1, 1, 1)
-    date1 = datetime.datetime(1, 1, 1)
+    # pylint: disable=too-many-return-statements
+    nodate = datetime.datetime(1, 1, 1), datetime.datetime(1, 1, 1)
     deltaday = datetime.timedelta(days=1)
+    size, n_mid, n_low = len(fields), fields.count("-"), fields.count("_")
 
     # CASE1: YYYY:
-    if len(fields) == 4 and fields.isdigit():
-        in_bounds = year_bounds[0] <= int(fields) <= year_bounds[1]
-        if in_bounds:
-            date0 = datetime.datetime(int(fields), 1, 1)
-            date1 = datetime.datetime(int(fields) + 1, 1, 1)
+    if size == 4:
+        if fields.isdigit():
+            if year_bounds[0] <= int(fields) <= year_bounds[1]:
+                return (datetime.datetime(int(fields), 1, 1),
+                        datetime.datetime(int(fields) + 1, 1, 1))
+        return nodate
 
     # CASE2&3: YYYY-YYYY or YYYY_YYYY
-    mid_bar = len(fields.split("-")) == 2
-    low_bar = len(fields.split("_")) == 2
-    if len(fields) == 9 and (mid_bar or low_bar):
-        year0_str, year1_str = fields.split("-" if mid_bar else "_")
+    if size == 9 and (n_mid == 1 or n_low == 1):
+        year0_str, year1_str = fields.split("-" if n_mid == 1 else "_")
         if year0_str.isdigit() and year1_str.isdigit():
             in_bounds0 = year_bounds[0] <= int(year0_str) <= year_bounds[1]
             in_bounds1 = year_bounds[0] <= int(year1_str) <= year_bounds[1]
             if in_bounds0 and in_bounds1:
-                date0 = datetime.datetime(int(year0_str), 1, 1)
-                date1 = datetime.datetime(int(year1_str) + 1, 1, 1)
+                return (datetime.datetime(int(year0_str), 1, 1),
+                        datetime.datetime(int(year1_str) + 1, 1, 1))
+        return nodate
 
     # CASE4: YYYY-MM
-    if len(fields) == 7 and len(fields.split("-")) == 2:
+    if size == 7 and n_mid == 1:
         year0_str, mnth0_str = fields.split("-")
         if year0_str.isdigit() and mnth0_str.isdigit():
             in_bounds_yr = year_bounds[0] <= int(year0_str) <= year_bounds[1]
@@ -109,10 +151,11 @@ def get_folder_kdin_bounds(folder: Path, year_bounds=(1800, 2300)
             if in_bounds_yr and in_bounds_mt:
                 date0 = datetime.datetime(int(year0_str), int(mnth0_str), 1)
                 date1 = date0 + datetime.timedelta(days=31)
-                date1 = datetime.datetime(date1.year, date1.month, 1)
+                return date0, datetime.datetime(date1.year, date1.month, 1)
+        return nodate
 
     # CASE5: YYYY-MM-DD
-    if len(fields) == 10 and len(fields.split("-")) == 3:
+    if size == 10 and n_mid == 2:
         year0_str, mnth0_str, day_str = fields.split("-")
         if year0_str.isdigit() and mnth0_str.isdigit() and day_str.isdigit():
             in_bounds_yr = year_bounds[0] <= int(year0_str) <= year_bounds[1]
@@ -121,17 +164,17 @@ def get_folder_kdin_bounds(folder: Path, year_bounds=(1800, 2300)
                 try:
                     date0 = datetime.datetime(int(year0_str), int(mnth0_str),
                                               int(day_str))
-                    date1 = date0 + datetime.timedelta(days=1)
+                    return date0, date0 + deltaday
                 except ValueError:
                     pass
+        return nodate
 
     # CASE6: YYYY-MM_MM
-    tst0 = len(fields.split("-")) == 2
-    tst1 = len(fields.split("_")) == 2
-    if len(fields) == 10 and tst0 and tst1:
-        year0_str = fields.split("-")[0]
-        mnth0_str = fields.split("-")[1].split("_")[0]
-        mnth1_str = fields.split("-")[1].split("_")[1]
+    if size == 10 and n_mid == 1 and n_low == 1:
+        dashed = fields.split("-")
+        year0_str = dashed[0]
+        mnth0_str = dashed[1].split("_")[0]
+        mnth1_str = dashed[1].split("_")[1]
         if year0_str.isdigit() and mnth0_str.isdigit() and mnth1_str.isdigit():
             in_bounds_yr = year_bounds[0] <= int(year0_str) <= year_bounds[1]
             in_bounds_mt0 = 1 <= int(mnth0_str) <= 12
@@ -140,38 +183,40 @@ def get_folder_kdin_bounds(folder: Path, year_bounds=(1800, 2300)
                 date0 = datetime.datetime(int(year0_str), int(mnth0_str), 1)
                 date1 = datetime.datetime(int(year0_str), int(mnth1_str), 1)
                 date1 = date1 + datetime.timedelta(days=31)
-                date1 = datetime.datetime(date1.year, date1.month, 1)
+                return date0, datetime.datetime(date1.year, date1.month, 1)
+        return nodate
 
     # CASE7: YYYY-MM-DD_DD
-    tst0 = len(fields.split("-")) == 3
-    tst1 = len(fields.split("_")) == 2
-    if len(fields) == 13 and tst0 and tst1:
-        year0_str = fields.split("-")[0]
-        mnth0_str = fields.split("-")[1]
-        day0_str = fields.split("-")[2].split("_")[0]
-        day1_str = fields.split("-")[2].split("_")[1]
+    if size == 13 and n_mid == 2 and n_low == 1:
+        dashed = fields.split("-")
+        year0_str = dashed[0]
+        mnth0_str = dashed[1]
+        day0_str = dashed[2].split("_")[0]
+        day1_str = dashed[2].split("_")[1]
         days_are_digis = day0_str.isdigit() and day1_str.isdigit()
         if year0_str.isdigit() and mnth0_str.isdigit() and days_are_digis:
             in_bounds_yr = year_bounds[0] <= int(year0_str) <= year_bounds[1]
             in_bounds_mt = 1 <= int(mnth0_str) <= 12
             if in_bounds_yr and in_bounds_mt:
+                # keeps date0 when only the final date is invalid
+                date0 = nodate[0]
                 try:
                     date0 = datetime.datetime(int(year0_str), int(mnth0_str),
                                               int(day0_str))
                     date1 = datetime.datetime(int(year0_str), int(mnth0_str),
                                               int(day1_str))
-                    date1 = date1 + deltaday
+                    return date0, date1 + deltaday
                 except ValueError:
-                    pass
+                    return date0, nodate[1]
+        return nodate
 
     # CASE8: YYYY-MM_YYYY-MM
-    tst0 = len(fields.split("-")) == 3
-    tst1 = len(fields.split("_")) == 2
-    if len(fields) == 15 and tst0 and tst1:
-        year0_str = fields.split("_")[0].split("-")[0]
-        mnth0_str = fields.split("_")[0].split("-")[1]
-        year1_str = fields.split("_")[1].split("-")[0]
-        mnth1_str = fields.split("_")[1].split("-")[1]
+    if size == 15 and n_mid == 2 and n_low == 1:
+        dates = fields.split("_")
+        year0_str = dates[0].split("-")[0]
+        mnth0_str = dates[0].split("-")[1]
+        year1_str = dates[1].split("-")[0]
+        mnth1_str = dates[1].split("-")[1]
         years_aredigit = year0_str.isdigit() and year1_str.isdigit()
         mnths_aredigit = mnth0_str.isdigit() and mnth1_str.isdigit()
         if years_aredigit and mnths_aredigit:
@@ -185,17 +230,17 @@ def get_folder_kdin_bounds(folder: Path, year_bounds=(1800, 2300)
                 date0 = datetime.datetime(int(year0_str), int(mnth0_str), 1)
                 date1 = datetime.datetime(int(year1_str), int(mnth1_str), 1)
                 date1 = date1 + datetime.timedelta(days=31)
-                date1 = datetime.datetime(date1.year, date1.month, 1)
+                return date0, datetime.datetime(date1.year, date1.month, 1)
+        return nodate
 
     # CASE9: YYYY-MM-DD_MM-DD
-    tst0 = len(fields.split("-")) == 4
-    tst1 = len(fields.split("_")) == 2
-    if len(fields) == 16 and tst0 and tst1:
-        year0_str = fields.split("_")[0].split("-")[0]
-        mnth0_str = fields.split("_")[0].split("-")[1]
-        day0_str = fields.split("_")[0].split("-")[2]
-        mnth1_str = fields.split("_")[1].split("-")[0]
-        day1_str = fields.split("_")[1].split("-")[1]
+    if size == 16 and n_mid == 3 and n_low == 1:
+        dates = fields.split("_")
+        year0_str = dates[0].split("-")[0]
+        mnth0_str = dates[0].split("-")[1]
+        day0_str = dates[0].split("-")[2]
+        mnth1_str = dates[1].split("-")[0]
+        day1_str = dates[1].split("-")[1]
         mnths_aredigit = mnth0_str.isdigit() and mnth1_str.isdigit()
         days_aredigit = day0_str.isdigit() and day1_str.isdigit()
         if year0_str.isdigit() and mnths_aredigit and days_aredigit:
@@ -203,25 +248,27 @@ def get_folder_kdin_bounds(folder: Path, year_bounds=(1800, 2300)
             in_bounds_mt0 = 1 <= int(mnth0_str) <= 12
             in_bounds_mt1 = 1 <= int(mnth1_str) <= 12
             if in_bounds_yr0 and in_bounds_mt0 and in_bounds_mt1:
+                # keeps date0 when only the final date is invalid
+                date0 = nodate[0]
                 try:
                     date0 = datetime.datetime(int(year0_str), int(mnth0_str),
                                               int(day0_str))
                     date1 = datetime.datetime(int(year0_str), int(mnth1_str),
                                               int(day1_str))
-                    date1 = date1 + deltaday
+                    return date0, date1 + deltaday
                 except ValueError:
-                    pass
+                    return date0, nodate[1]
+        return nodate
 
     # CASE10: YYYY-MM-DD_YYYY-MM-DD
-    tst0 = len(fields.split("-")) == 5
-    tst1 = len(fields.split("_")) == 2
-    if len(fields) == 21 and tst0 and tst1:
-        year0_str = fields.split("_")[0].split("-")[0]
-        mnth0_str = fields.split("_")[0].split("-")[1]
-        day0_str = fields.split("_")[0].split("-")[2]
-        year1_str = fields.split("_")[1].split("-")[0]
-        mnth1_str = fields.split("_")[1].split("-")[1]
-        day1_str = fields.split("_")[1].split("-")[2]
+    if size == 21 and n_mid == 4 and n_low == 1:
+        dates = fields.split("_")
+        year0_str = dates[0].split("-")[0]
+        mnth0_str = dates[0].split("-")[1]
+        day0_str = dates[0].split("-")[2]
+        year1_str = dates[1].split("-")[0]
+        mnth1_str = dates[1].split("-")[1]
+        day1_str = dates[1].split("-")[2]
         years_aredigit = year0_str.isdigit() and year1_str.isdigit()
         mnths_aredigit = mnth0_str.isdigit() and mnth1_str.isdigit()
         days_aredigit = day0_str.isdigit() and day1_str.isdigit()
@@ -233,15 +280,17 @@ def get_folder_kdin_bounds(folder: Path, year_bounds=(1800, 2300)
             years_in_bounds = in_bounds_yr0 and in_bounds_yr1
             mnths_in_bounds = in_bounds_mt0 and in_bounds_mt1
             if years_in_bounds and mnths_in_bounds:
+                # keeps date0 when only the final date is invalid
+                date0 = nodate[0]
                 try:
                     date0 = datetime.datetime(int(year0_str), int(mnth0_str),
                                               int(day0_str))
                     date1 = datetime.datetime(int(year1_str), int(mnth1_str),
                                               int(day1_str))
-                    date1 = date1 + deltaday
+                    return date0, date1 + deltaday
                 except ValueError:
-                    pass
-    return date0, date1
+                    return date0, nodate[1]
+    return nodate
 
 
 def get_file_kdin(file: Path, year_bounds=(1800, 2300)) -> datetime.datetime:
@@ -261,8 +310,13 @@ def get_file_kdin(file: Path, year_bounds=(1800, 2300)) -> datetime.datetime:
         > ...
     --------------------------------------------------------------------------
     """
+    return _PARSER_CACHE.parse(_kdin_from_filename, file.name, year_bounds)
+
+
+def _kdin_from_filename(filename: str, year_bounds=(1800, 2300)
+                        ) -> datetime.datetime:
+    """Get the KDIN date of the filename (see 'get_file_kdin()')"""
     date = datetime.datetime(1, 1, 1)
-    filename = file.name
     if len(filename) < 15:
         return date
 
@@ -298,9 +352,15 @@ def get_file_ekdin(file: Path, year_bounds=(1800, 2300)) -> datetime.datetime:
         > ...
     --------------------------------------------------------------------------
     """
+    return _PARSER_CACHE.parse(_ekdin_from_filename, file.name, year_bounds)
+
+
+def _ekdin_from_filename(filename: str, year_bounds=(1800, 2300)
+                         ) -> datetime.datetime:
+    """Get the EKDIN date of the filename (see 'get_file_ekdin()')"""
     # pylint: disable=too-many-locals
     date = datetime.datetime(1, 1, 1)
-    filename_lst = file.name.split("++")
+    filename_lst = filename.split("++")
 
     if len(filename_lst) == 3:
         datename = str(filename_lst[1])
@@ -324,6 +384,146 @@ def get_file_ekdin(file: Path, year_bounds=(1800, 2300)) -> datetime.datetime:
     return date
 
 
+def get_files_kdin_batch(files: Iterable[Union[Path, str]],
+                         year_bounds=(1800, 2300)
+                         ) -> Tuple["numpy.ndarray", "numpy.ndarray"]:
+    """
+    --------------------------------------------------------------------------
+    Batch version of 'get_file_kdin()' (requires numpy). Files can be given
+    as Path objects, filenames (str) or a numpy array of filenames. Returns
+    the 'datetime64[s]' array of dates and the boolean mask of the files
+    matching the convention (same as 'is_file_kdin()'). Not found dates are
+    returned as datetime(1, 1, 1) like in the scalar version.
+    --------------------------------------------------------------------------
+    """
+    # pylint: disable=import-outside-toplevel
+    import numpy as np
+
+    names = _batch_filenames(files)
+    codes = names.astype("U15").view(np.uint32).reshape(-1, 15)
+    fields = np.r_[0:8, 9:15]
+    digits = codes[:, fields]
+    is_digit = np.all((digits >= 48) & (digits <= 57), axis=1)
+    pattern = (codes[:, 8] == ord("-")) & (codes[:, 14] != 0)
+
+    dates, valid = _batch_datetimes(np.where(is_digit[:, None], digits, 48),
+                                    is_digit & pattern, year_bounds)
+    # Non-ASCII digits, signs or spaces are still accepted by 'int()'
+    _batch_fallback(get_file_kdin, names, dates, valid, year_bounds,
+                    pattern & ~is_digit & _int_like(digits))
+    return dates, valid
+
+
+def get_files_ekdin_batch(files: Iterable[Union[Path, str]],
+                          year_bounds=(1800, 2300)
+                          ) -> Tuple["numpy.ndarray", "numpy.ndarray"]:
+    """
+    --------------------------------------------------------------------------
+    Batch version of 'get_file_ekdin()' (requires numpy). Files can be given
+    as Path objects, filenames (str) or a numpy array of filenames. Returns
+    the 'datetime64[s]' array of dates and the boolean mask of the files
+    matching the convention (same as 'is_file_ekdin()'). Not found dates are
+    returned as datetime(1, 1, 1) like in the scalar version.
+    --------------------------------------------------------------------------
+    """
+    # pylint: disable=import-outside-toplevel
+    import numpy as np
+
+    names = _batch_filenames(files)
+    if not names.size:
+        return np.array([], "datetime64[s]"), np.array([], bool)
+    datenames = np.char.partition(np.char.partition(names, "++")[:, 2], "++")
+    datenames = datenames[:, 0]
+    codes = datenames.astype("U19").view(np.uint32).reshape(-1, 19)
+    fields = np.r_[0:4, 5:7, 8:10, 11:13, 14:16, 17:19]
+    digits = codes[:, fields]
+    is_digit = np.all((digits >= 48) & (digits <= 57), axis=1)
+    two_marks = np.char.count(names, "++") == 2
+    separators = (codes[:, [4, 7, 13, 16]] == ord("-")).all(axis=1)
+    pattern = two_marks & (codes[:, 10] == ord("+")) & separators
+    extras_ok = np.char.count(datenames, "-") == 4
+    extras_ok &= np.char.count(datenames, "+") == 1
+
+    dates, valid = _batch_datetimes(np.where(is_digit[:, None], digits, 48),
+                                    is_digit & pattern & extras_ok,
+                                    year_bounds)
+    # Short datenames or non-ASCII digits, signs or spaces in the fields
+    _batch_fallback(get_file_ekdin, names, dates, valid, year_bounds,
+                    pattern & extras_ok & ~is_digit & _int_like(digits))
+    return dates, valid
+
+
+def _batch_filenames(files: Iterable[Union[Path, str]]) -> "numpy.ndarray":
+    """Return the filenames of the batch as a numpy array of strings"""
+    # pylint: disable=import-outside-toplevel
+    import numpy as np
+
+    if isinstance(files, np.ndarray):
+        return files.astype(str).ravel()
+    names = [x.name if isinstance(x, Path) else x for x in files]
+    return np.array(names, dtype=str).reshape(-1)
+
+
+def _int_like(digits: "numpy.ndarray") -> "numpy.ndarray":
+    """Rows with any char (non-ASCII, ' ', '+', '-', '_', '\\0') for 'int()'"""
+    # pylint: disable=import-outside-toplevel
+    import numpy as np
+
+    int_chars = [ord(x) for x in " +-_\0"]
+    return np.any((digits > 127) | np.isin(digits, int_chars), axis=1)
+
+
+def _batch_datetimes(digits: "numpy.ndarray", candidates: "numpy.ndarray",
+                     year_bounds=(1800, 2300)
+                     ) -> Tuple["numpy.ndarray", "numpy.ndarray"]:
+    """
+    --------------------------------------------------------------------------
+    Convert the ASCII codes of the 14 digits YYYYMMDDHHMMSS of every row into
+    'datetime64[s]' validating the year_bounds and the calendar in bulk. Not
+    valid rows (or not candidates) are set to datetime(1, 1, 1).
+    --------------------------------------------------------------------------
+    """
+    # pylint: disable=import-outside-toplevel, too-many-locals
+    import numpy as np
+
+    vals = digits.astype(np.int64) - 48
+    year = vals[:, 0] * 1000 + vals[:, 1] * 100 + vals[:, 2] * 10 + vals[:, 3]
+    mnth, day = vals[:, 4] * 10 + vals[:, 5], vals[:, 6] * 10 + vals[:, 7]
+    hour, mnts = vals[:, 8] * 10 + vals[:, 9], vals[:, 10] * 10 + vals[:, 11]
+    secs = vals[:, 12] * 10 + vals[:, 13]
+
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    mdays = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+    mdays = mdays[np.clip(mnth, 1, 12) - 1] + (leap & (mnth == 2))
+
+    year_ok = (year_bounds[0] <= year) & (year <= year_bounds[1]) & (year >= 1)
+    date_ok = (mnth >= 1) & (mnth <= 12) & (day >= 1) & (day <= mdays)
+    time_ok = (hour < 24) & (mnts < 60) & (secs < 60)
+    valid = candidates & year_ok & date_ok & time_ok
+    year, mnth, day = np.where(valid, year, 1), np.where(valid, mnth, 1), \
+        np.where(valid, day, 1)
+    hour, mnts, secs = hour * valid, mnts * valid, secs * valid
+
+    months = ((year - 1970) * 12 + mnth - 1).astype("datetime64[M]")
+    dates = (months.astype("datetime64[D]") + (day - 1)).astype(
+        "datetime64[s]") + (hour * 3600 + mnts * 60 + secs)
+    return dates, valid & (year != 1)
+
+
+def _batch_fallback(scalar_func, names: "numpy.ndarray",
+                    dates: "numpy.ndarray", valid: "numpy.ndarray",
+                    year_bounds, rows: "numpy.ndarray") -> None:
+    """Solve (inplace) with the scalar function the rare ambiguous rows"""
+    # pylint: disable=import-outside-toplevel, too-many-arguments
+    # pylint: disable=too-many-positional-arguments
+    import numpy as np
+
+    for row in np.flatnonzero(rows):
+        date = scalar_func(Path(str(names[row])), year_bounds)
+        dates[row] = np.datetime64(date, "s")
+        valid[row] = date.year != 1
+
+
 def is_folder_kdin(folder: Path, year_bounds=(1800, 2300)) -> bool:
     """
     --------------------------------------------------------------------------
@@ -368,9 +568,88 @@ def is_file_trkdin(file: Path, year_bounds=(1800, 2300)) -> bool:
     convention
     --------------------------------------------------------------------------
     """
-    is_kdin = is_file_kdin(file, year_bounds)
-    kdin_txt = date2kdin(get_file_kdin(file, year_bounds))
-    return is_kdin and (kdin_txt + "(DTR)") in file.name
+    date = _PARSER_CACHE.parse(_kdin_from_filename, file.name, year_bounds)
+    return date.year != 1 and _trkdin_start(file.name, date) >= 0
+
+
+def _trkdin_start(filename: str, date: datetime.datetime) -> int:
+    """
+    --------------------------------------------------------------------------
+    Return the position of the TRKDIN token (KDIN of <date> + '(DTR)') in the
+    filename or -1 if it is not found. The usual TRKDIN filename is solved
+    without formatting the date back to a KDIN string.
+    --------------------------------------------------------------------------
+    """
+    if filename[15:20] == "(DTR)" and date.year >= 1000:
+        plain_digits = filename[:15].isascii() and filename[:8].isdigit()
+        if plain_digits and filename[9:15].isdigit():
+            return 0
+    if "(DTR)" not in filename:
+        return -1
+    return filename.find(date2kdin(date) + "(DTR)")
+
+
+class FilenameMatch(NamedTuple):
+    """
+    --------------------------------------------------------------------------
+    Result of 'classify_filename()'
+    - kind: "KDIN", "TRKDIN", "EKDIN", the proprietary convention class name
+            (e.g: "GooglePhotos") or "" if no convention matches
+    - date: date-in-name found (datetime(1, 1, 1) if no convention matches)
+    - start, stop: slice offsets of the date token in the filename
+    --------------------------------------------------------------------------
+    """
+    kind: str
+    date: datetime.datetime
+    start: int
+    stop: int
+
+
+def classify_filename(file: Path, year_bounds=(1800, 2300),
+                      proprietary=True) -> FilenameMatch:
+    """
+    --------------------------------------------------------------------------
+    Classify the file in one of the date-in-name conventions parsing its
+    name only once. When more than one convention matches, the first one in
+    this order is returned: EKDIN, TRKDIN, KDIN, proprietary conventions.
+    - proprietary: if disabled, the proprietary conventions are not checked
+    - Date token slices:
+        > KDIN:   YYYYMMDD-HHMMSS
+        > TRKDIN: YYYYMMDD-HHMMSS(DTR)
+        > EKDIN:  ++YYYY-MM-DD+HH-MM-SS++
+        > Proprietary: the proprietary date-name (e.g. IMG_YYYYMMDD_HHMMSS)
+    --------------------------------------------------------------------------
+    """
+    # pylint: disable=import-outside-toplevel, cyclic-import
+    filename = file.name
+    if filename.count("++") == 2:
+        try:
+            date = _PARSER_CACHE.parse(_ekdin_from_filename, filename,
+                                       year_bounds)
+        except IndexError:
+            date = datetime.datetime(1, 1, 1)
+        if date.year != 1:
+            start = filename.index("++")
+            stop = filename.index("++", start + 2) + 2
+            return FilenameMatch("EKDIN", date, start, stop)
+
+    date = _PARSER_CACHE.parse(_kdin_from_filename, filename, year_bounds)
+    if date.year != 1:
+        start = _trkdin_start(filename, date)
+        if start < 0:
+            return FilenameMatch("KDIN", date, 0, 15)
+        return FilenameMatch("TRKDIN", date, start, start + 20)
+
+    if proprietary:
+        from .. import proprietdin
+        convention, date = proprietdin.match_proprietary_din(file,
+                                                             year_bounds)
+        if convention is not None:
+            datename = convention.get_datename(file)
+            start = max(filename.find(datename), 0)
+            return FilenameMatch(type(convention).__name__, date, start,
+                                 start + len(datename))
+    return FilenameMatch("", datetime.datetime(1, 1, 1), 0, 0)
 
 
 def date2kdin(date: datetime.datetime) -> str:
@@ -430,3 +709,88 @@ def file_clean2trkdin(file: Path, date2add: datetime.datetime) -> Path:
     else:
         new_name = file.with_name(kdin_date + "(DTR) " + file.name)
     return new_name
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of the parsers cache (see 'parser_cache_info()')"""
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class ParserCache:
+    """
+    --------------------------------------------------------------------------
+    Bounded LRU cache for the date-in-name parsers of this module. Results are
+    keyed on (parser, name, year_bounds) where 'name' is the folder/file name
+    string (not the Path), so the same name under different parents is only
+    parsed once. A 'maxsize' of 0 disables the cache.
+    - The module cache is disabled by default (names are usually unique and
+      the lookup would only add overhead): enable it with
+      'set_parser_cache()' for trees repeating the same names
+    --------------------------------------------------------------------------
+    """
+    def __init__(self, maxsize=2**16):
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[tuple, Any]" = OrderedDict()
+        self.maxsize = maxsize
+        self.hits, self.misses, self.evictions = 0, 0, 0
+
+    def parse(self, parser: Callable, name: str, year_bounds=(1800, 2300)):
+        """Return parser(name, year_bounds) from the cache if available"""
+        if self.maxsize <= 0:
+            return parser(name, year_bounds)
+        key = (parser, name, tuple(year_bounds))
+        with self._lock:
+            if key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return self._data[key]
+        result = parser(name, year_bounds)
+        with self._lock:
+            self.misses += 1
+            self._data[key] = result
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def resize(self, maxsize: int):
+        """Change the maximum size evicting the least recently used items"""
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._data) > max(maxsize, 0):
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Remove all the cached results and reset the statistics"""
+        with self._lock:
+            self._data.clear()
+            self.hits, self.misses, self.evictions = 0, 0, 0
+
+    def info(self) -> CacheInfo:
+        """Return the cache statistics"""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions,
+                             self.maxsize, len(self._data))
+
+
+_PARSER_CACHE = ParserCache(maxsize=0)
+
+
+def set_parser_cache(maxsize=2**16):
+    """Enable the parsers cache with <maxsize> items (0 to disable it)"""
+    _PARSER_CACHE.resize(maxsize)
+
+
+def parser_cache_info() -> CacheInfo:
+    """Return the hits/misses/evictions statistics of the parsers cache"""
+    return _PARSER_CACHE.info()
+
+
+def parser_cache_clear():
+    """Clear the parsers cache and its statistics"""
+    _PARSER_CACHE.clear()
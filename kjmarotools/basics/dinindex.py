@@ -0,0 +1,184 @@
+"""Date index of the Kjmaro DIN folders (see 'conventions')"""
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from typing import TYPE_CHECKING
+from pathlib import Path
+import bisect
+import datetime
+
+from . import conventions
+
+if TYPE_CHECKING:
+    import numpy
+
+
+class FolderDateIndex:
+    """
+    --------------------------------------------------------------------------
+    Interval index over the date bounds of the KDIN folders of a folder tree
+    (folders not following the convention are ignored). It is built once in
+    O(n log^2 n) and answers which folders cover a given date in
+    O(log n + k) (k: folders found).
+    --------------------------------------------------------------------------
+    - The timeline is split in elementary segments between every bound. The
+      folders covering a segment (narrowest folder first) are found in an
+      interval tree on the first query of the segment and kept for the next
+      queries, so only the queried segments are stored.
+    - Folder bounds follow 'get_folder_kdin_bounds()': [date0, date1)
+    --------------------------------------------------------------------------
+    """
+    def __init__(self, folders_tree: Iterable[Path], year_bounds=(1800, 2300)):
+        folders = list(folders_tree)
+        bounds = conventions.get_folders_kdin_bounds_batch(folders,
+                                                           year_bounds)
+        nodate = datetime.datetime(1, 1, 1)
+        self.folders: List[Path] = []
+        self.bounds: List[Tuple[datetime.datetime, datetime.datetime]] = []
+        for folder, (date0, date1) in zip(folders, bounds):
+            if date0 != nodate and date0 < date1:
+                self.folders.append(folder)
+                self.bounds.append((date0, date1))
+        self._starts = sorted({x for bound in self.bounds for x in bound})
+        self._starts_array: Optional["numpy.ndarray"] = None
+        self._covers: Dict[int, Tuple[Path, ...]] = {}
+        self._tree = _build_tree(self.bounds, list(range(len(self.bounds))))
+
+    def _segment_covers(self, pos: int) -> Tuple[Path, ...]:
+        """Return the folders covering the segment <pos> (narrowest first)"""
+        covers = self._covers.get(pos)
+        if covers is None:
+            found = _stab(self._tree, self.bounds, self._starts[pos])
+            found.sort(key=self._width)
+            covers = tuple(self.folders[x] for x in found)
+            self._covers[pos] = covers
+        return covers
+
+    def _width(self, idx: int) -> Tuple[datetime.timedelta, int]:
+        """Sorting key to return the narrowest folders first"""
+        return self.bounds[idx][1] - self.bounds[idx][0], idx
+
+    def __len__(self) -> int:
+        return len(self.folders)
+
+    def query(self, date: datetime.datetime) -> Tuple[Path, ...]:
+        """
+        ----------------------------------------------------------------------
+        Return all the folders whose bounds cover the <date> (narrowest first)
+        ----------------------------------------------------------------------
+        """
+        pos = bisect.bisect_right(self._starts, date) - 1
+        return self._segment_covers(pos) if pos >= 0 else ()
+
+    def query_many(self, dates: Iterable) -> List[Tuple[Path, ...]]:
+        """
+        ----------------------------------------------------------------------
+        Bulk version of 'query()'. <dates> can be an iterable of datetimes or
+        a numpy 'datetime64' array (bisected in bulk with numpy). Returned
+        tuples are shared between dates falling in the same segment.
+        ----------------------------------------------------------------------
+        """
+        # pylint: disable=import-outside-toplevel
+        if type(dates).__module__ == "numpy" and self._starts:
+            import numpy as np
+            starts = self._starts_array
+            if starts is None:
+                starts = np.array(self._starts, dtype="datetime64[us]")
+                self._starts_array = starts
+            positions = np.searchsorted(starts, np.asarray(dates),
+                                        side="right") - 1
+            return [self._segment_covers(x) if x >= 0 else ()
+                    for x in positions.tolist()]
+        return [self.query(x) for x in dates]
+
+    def best(self, date: datetime.datetime) -> Optional[Path]:
+        """Return the narrowest folder covering the <date> (None if none)"""
+        covers = self.query(date)
+        return covers[0] if covers else None
+
+    def overlaps(self, nested=True) -> List[Tuple[Path, Path]]:
+        """
+        ----------------------------------------------------------------------
+        Return the pairs of folders whose bounds overlap (sorted by date0)
+        - nested: if disabled, pairs where a folder contains the other one
+                  (e.g. '2021' and '2021-10') are not returned
+        ----------------------------------------------------------------------
+        """
+        order = sorted(range(len(self.bounds)), key=lambda x: self.bounds[x])
+        pairs: List[Tuple[Path, Path]] = []
+        active: List[int] = []
+        for idx in order:
+            date0, date1 = self.bounds[idx]
+            active = [x for x in active if self.bounds[x][1] > date0]
+            for other in active:
+                odate0, odate1 = self.bounds[other]
+                contained = odate0 <= date0 and date1 <= odate1
+                contains = date0 <= odate0 and odate1 <= date1
+                if nested or not (contained or contains):
+                    pairs.append((self.folders[other], self.folders[idx]))
+            active.append(idx)
+        return pairs
+
+
+class _Node(NamedTuple):
+    """
+    --------------------------------------------------------------------------
+    Node of the interval tree: the intervals containing the <center> sorted
+    by date0 and by date1 (descending), and the subtrees of the intervals
+    ending before it and starting after it
+    --------------------------------------------------------------------------
+    """
+    center: datetime.datetime
+    by_start: List[int]
+    by_end: List[int]
+    left: Optional["_Node"]
+    right: Optional["_Node"]
+
+
+def _build_tree(bounds: List[Tuple[datetime.datetime, datetime.datetime]],
+                items: List[int]) -> Optional[_Node]:
+    """
+    --------------------------------------------------------------------------
+    Build the centered interval tree of the <items> (indexes of <bounds>).
+    The center is the lower median of the bounds, so both subtrees have at
+    most half of the items and the depth is O(log n).
+    --------------------------------------------------------------------------
+    """
+    if not items:
+        return None
+    points = sorted(x for idx in items for x in bounds[idx])
+    center = points[(len(points) - 1) // 2]
+    here: List[int] = []
+    left: List[int] = []
+    right: List[int] = []
+    for idx in items:
+        date0, date1 = bounds[idx]
+        if date1 <= center:
+            left.append(idx)
+        elif date0 > center:
+            right.append(idx)
+        else:
+            here.append(idx)
+    by_start = sorted(here, key=lambda x: bounds[x][0])
+    by_end = sorted(here, key=lambda x: bounds[x][1], reverse=True)
+    return _Node(center, by_start, by_end, _build_tree(bounds, left),
+                 _build_tree(bounds, right))
+
+
+def _stab(node: Optional[_Node],
+          bounds: List[Tuple[datetime.datetime, datetime.datetime]],
+          date: datetime.datetime) -> List[int]:
+    """Return the items of the tree whose bounds cover the <date>"""
+    found: List[int] = []
+    while node is not None:
+        if date < node.center:
+            for idx in node.by_start:
+                if bounds[idx][0] > date:
+                    break
+                found.append(idx)
+            node = node.left
+        else:
+            for idx in node.by_end:
+                if bounds[idx][1] <= date:
+                    break
+                found.append(idx)
+            node = node.right
+    return found
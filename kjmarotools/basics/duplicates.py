@@ -0,0 +1,168 @@
+"""Staged finder of duplicated files (size -> partial hash -> full hash)"""
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+import hashlib
+import queue
+import os
+
+from . import ostools
+
+
+class DuplicateReport(NamedTuple):
+    """
+    --------------------------------------------------------------------------
+    Result of 'find_duplicates()':
+    - groups: files with the same content (sorted, groups sorted by the
+              first file)
+    - failed: {file: error} of the files that could not be read
+    - bytes_read: bytes read to find the groups
+    - bytes_avoided: bytes not read compared to a single full read of every
+                     file (negative when most files of the same size are
+                     identical: their partial hashes are read on top of the
+                     full ones)
+    --------------------------------------------------------------------------
+    """
+    groups: List[List[Path]]
+    failed: Dict[Path, str]
+    bytes_read: int
+    bytes_avoided: int
+
+
+def find_duplicates(files: Iterable[Path], partial_size=16 * 1024,
+                    algorithm="md5", workers=8) -> DuplicateReport:
+    """
+    --------------------------------------------------------------------------
+    Find the groups of duplicated files in <files> (e.g. the result of
+    'filetools.get_files_tree()') reading as little data as possible:
+    1. Files are grouped by size (a file with a unique size is never read)
+    2. Only the first and last <partial_size> bytes of the files of the same
+       size are hashed
+    3. Only the files still colliding are fully hashed
+    The stages run concurrently in a pool of <workers> threads: the files
+    of a size group are fully hashed as soon as its partial hashes are done.
+    Hard links of a file already listed (same device and inode) are
+    skipped: they share the data, so they are not reported nor counted.
+    --------------------------------------------------------------------------
+    """
+    finder = _DuplicateFinder(partial_size, algorithm)
+    buckets = finder.stat_files(files)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        finder.run(pool, buckets)
+    return finder.report()
+
+
+class _DuplicateFinder:
+    """State of a 'find_duplicates()' run"""
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, partial_size: int, algorithm: str):
+        self.partial_size = partial_size
+        self.algorithm = algorithm
+        self.groups: List[List[Path]] = []
+        self.failed: Dict[Path, str] = {}
+        self.bytes_total = 0
+        self.bytes_read = 0
+        self._done: "queue.Queue[Tuple[tuple, Path, Future]]" = queue.Queue()
+        self._pending = 0
+        self._left: Dict[tuple, int] = {}
+        self._digests: Dict[tuple, Dict[str, List[Path]]] = {}
+
+    def stat_files(self, files: Iterable[Path]) -> Dict[int, List[Path]]:
+        """Return the files by size (hard links of a listed file skipped)"""
+        inodes: Set[Tuple[int, int]] = set()
+        buckets: Dict[int, List[Path]] = {}
+        for file in dict.fromkeys(files):
+            try:
+                stat = os.stat(file)
+            except OSError as error:
+                self.failed[file] = str(error)
+                continue
+            inode = (stat.st_dev, stat.st_ino)
+            if inode in inodes:
+                continue
+            inodes.add(inode)
+            self.bytes_total += stat.st_size
+            buckets.setdefault(stat.st_size, []).append(file)
+        return buckets
+
+    def run(self, pool: ThreadPoolExecutor, buckets: Dict[int, List[Path]]):
+        """Run the partial and full hash stages until all groups are done"""
+        for size, bucket in buckets.items():
+            if len(bucket) == 1 or size == 0:
+                self._add_group(bucket)
+                continue
+            self._left[("partial", size)] = len(bucket)
+            for file in bucket:
+                self._submit(pool, ("partial", size), file,
+                             _partial_digest, file, size, self.partial_size,
+                             self.algorithm)
+        while self._pending:
+            stage, file, future = self._done.get()
+            self._pending -= 1
+            try:
+                digest, read = future.result()
+            except OSError as error:
+                self.failed[file] = str(error)
+            else:
+                self.bytes_read += read
+                self._digests.setdefault(stage, {}).setdefault(
+                    digest, []).append(file)
+            self._left[stage] -= 1
+            if not self._left[stage]:
+                self._stage_done(pool, stage)
+
+    def _submit(self, pool: ThreadPoolExecutor, stage: tuple, file: Path,
+                function, *args):
+        """Submit a hash of a <stage> reporting to the done queue"""
+        future = pool.submit(function, *args)
+        self._pending += 1
+        future.add_done_callback(
+            lambda x: self._done.put((stage, file, x)))
+
+    def _stage_done(self, pool: ThreadPoolExecutor, stage: tuple):
+        """Send the colliding files of a finished <stage> to the next one"""
+        digests = self._digests.pop(stage, {})
+        for digest, files in digests.items():
+            if len(files) == 1:
+                self._add_group(files)
+            elif stage[0] == "full" or stage[1] <= 2 * self.partial_size:
+                # the partial hash already covered the whole file
+                self._add_group(files)
+            else:
+                next_stage = ("full", stage[1], digest)
+                self._left[next_stage] = len(files)
+                for file in files:
+                    self._submit(pool, next_stage, file, _full_digest, file,
+                                 self.algorithm)
+
+    def _add_group(self, files: List[Path]):
+        """Add the group of identical <files>"""
+        if len(files) > 1:
+            self.groups.append(sorted(files))
+
+    def report(self) -> DuplicateReport:
+        """Return the report of the run"""
+        self.groups.sort()
+        return DuplicateReport(self.groups, self.failed, self.bytes_read,
+                               self.bytes_total - self.bytes_read)
+
+
+def _partial_digest(file: Path, size: int, partial_size: int,
+                    algorithm: str) -> Tuple[str, int]:
+    """Return the hash of the first and last <partial_size> bytes"""
+    hsh = hashlib.new(algorithm)
+    with open(file, "rb") as fle:
+        if size <= 2 * partial_size:
+            data = fle.read()
+            hsh.update(data)
+            return hsh.hexdigest(), len(data)
+        hsh.update(fle.read(partial_size))
+        fle.seek(-partial_size, os.SEEK_END)
+        hsh.update(fle.read(partial_size))
+    return hsh.hexdigest(), 2 * partial_size
+
+
+def _full_digest(file: Path, algorithm: str) -> Tuple[str, int]:
+    """Return the hash of the whole file and the bytes read"""
+    digest = ostools.file_checksums(file, (algorithm,))[algorithm]
+    return digest, os.stat(file).st_size
@@ -1,9 +1,26 @@
 """File with basic file management tools in python"""
-from typing import List, Tuple, Optional
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List
+from typing import NamedTuple, Optional, Set, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
 from logging import Logger
 from pathlib import Path
+import functools
+import threading
+import fnmatch
 import shutil
+import errno
+import json
+import time
+import sys
 import os
+import re
+
+from . import conventions
+
+# Errors of the kernel copies meaning 'not supported for these files'
+_NO_KERNEL_COPY = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.ENOTSUP,
+                   errno.EOPNOTSUPP, errno.EBADF, errno.ETXTBSY}
+_COPY_BUFFER = 1024 * 1024
 
 
 def itername(file: Path, separator="-", idx=1) -> Path:
@@ -37,6 +54,7 @@ def get_folders_tree(base_folder: Path, filter_scan: Tuple[str, ...] = ()
     - filter_scan: [optional] Include a list of pattern-names in to scan in the
                    base_folder such as [*1*, stuffs*, *A, etc...] and the rest
                    of the folders in base_folder will be skiped.
+    - Raise ValueError if the base_folder can not be listed (no filter_scan)
 
     - Structure Example
         BaseFolder
@@ -47,16 +65,96 @@ def get_folders_tree(base_folder: Path, filter_scan: Tuple[str, ...] = ()
     """
     assert base_folder.is_absolute(), "'base_folder' must be an absolute path."
 
-    if not filter_scan:
-        full_tree = [Path(x[0]) for x in os.walk(base_folder)]
-        full_tree.sort()
-        full_tree.pop(full_tree.index(base_folder))
-        return full_tree
+    if any(is_path_pattern(x) for x in filter_scan):
+        return _get_folders_tree_glob(base_folder, filter_scan)
+
+    # Single scandir pass: only top-level names are matched against the
+    # patterns, unmatched subtrees are never listed
+    top_dirs = get_top_folders(base_folder, filter_scan)
+
+    full_tree: List[str] = []
+    pending = list(top_dirs)
+    while pending:
+        folder = pending.pop()
+        subdirs = scan_subfolders(folder)
+        if subdirs is None:
+            continue
+        full_tree.append(folder)
+        pending.extend(subdirs)
+    folders = [Path(x) for x in full_tree]
+    folders.sort()
+    return folders
+
+
+def get_top_folders(base_folder: Path, filter_scan: Tuple[str, ...] = ()
+                    ) -> List[str]:
+    """
+    --------------------------------------------------------------------------
+    Return the paths of the folders in <base_folder> whose name matches any
+    of the <filter_scan> name patterns (all if empty), the first level of
+    'get_folders_tree()'. Path patterns (see 'is_path_pattern()') are not
+    supported here. Raise ValueError if the <base_folder> can not be listed
+    and there is no <filter_scan> (as the former 'os.walk()' version of
+    'get_folders_tree()' did).
+    --------------------------------------------------------------------------
+    """
+    top_dirs = scan_subfolders(os.fspath(base_folder))
+    if top_dirs is None:
+        if not filter_scan:
+            raise ValueError(f"{base_folder!r} is not a readable directory")
+        return []
+    if filter_scan:
+        match = _compile_name_patterns(tuple(filter_scan))
+        top_dirs = [x for x in top_dirs
+                    if match(os.path.normcase(os.path.basename(x)))]
+    return top_dirs
+
 
+def scan_subfolders(folder: str) -> Optional[List[str]]:
+    """
+    --------------------------------------------------------------------------
+    Return the paths of the subfolders (symlinks not followed) of <folder>
+    or None if it can not be listed (as 'os.walk()', which skips it)
+    --------------------------------------------------------------------------
+    """
+    subdirs = []
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    subdirs.append(entry.path)
+    except OSError:
+        return None
+    return subdirs
+
+
+def is_path_pattern(pattern: str) -> bool:
+    """Return if the glob <pattern> is not a plain top-level name pattern"""
+    seps = (os.sep, os.altsep) if os.altsep else (os.sep,)
+    if pattern in ("", ".", "..") or "**" in pattern:
+        return True
+    return any(x in pattern for x in seps)
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_name_patterns(patterns: Tuple[str, ...]) -> Callable:
+    """Return the compiled match of a name against any of the <patterns>"""
+    regex = "|".join(fnmatch.translate(os.path.normcase(x))
+                     for x in patterns)
+    return re.compile(regex).match
+
+
+def _get_folders_tree_glob(base_folder: Path, filter_scan: Tuple[str, ...]
+                           ) -> List[Path]:
+    """'get_folders_tree()' for glob patterns with paths (e.g. 'a/b*')"""
     # Get the folders matching the patterns to be scanned
-    folders2scan = []
+    folders2scan: Set[Path] = set()
     for kwd in filter_scan:
-        folders2scan += list(base_folder.glob(kwd))
+        folders2scan.update(base_folder.glob(kwd))
 
     # Get the initial tree including only the desired folders
     folders_tree = [Path(x[0]) for x in os.walk(base_folder)]
@@ -82,66 +180,205 @@ def get_files_tree(folders_tree: List[Path], extensions: Tuple[str, ...] = (),
     - upper_lower: if enabled, it looks for the extension in both upper+lower
     ---------------------------------------------------------------------------
     """
-    exts = ["." + x for x in extensions]
-    if extensions:
-        for extension in extensions:
-            assert_txt = f"The extensions must not contain '.' <{extensions}>"
-            assert extension[0] != ".", assert_txt
-        if upper_lower:
-            exts = [x.upper() for x in exts]
-            exts = list(exts) + [x.lower() for x in exts]
-
-    full_files = []
-    for folder in folders_tree:
-        files_found = [folder.joinpath(x) for x in folder.glob("*")]
-        files_found = [x for x in files_found if x.is_file()]
-        if exts:
-            files_found = [x for x in files_found if x.suffix in exts]
-        if files_found:
-            full_files += files_found
+    full_files = list(iter_files_tree(folders_tree, extensions, upper_lower))
     full_files.sort()
     return full_files
 
 
-def get_folders_from_files(files_tree: List[Path]) -> List[Path]:
+def iter_files_tree(folders_tree: Iterable[Path],
+                    extensions: Tuple[str, ...] = (), upper_lower=True
+                    ) -> Iterator[Path]:
     """
     --------------------------------------------------------------------------
-    - Get a list of ABSOLUTE folders for a given ABSOLUTE files tree
+    Generator version of 'get_files_tree()': the files are yielded folder by
+    folder (sorted inside each folder) so only one folder listing is held in
+    memory. The 'os.scandir()' entries are used to check the file type (no
+    extra stat per file on most systems).
     --------------------------------------------------------------------------
     """
-    paths2create = []
+    exts = _extensions_set(extensions, upper_lower)
+    for folder in folders_tree:
+        yield from _list_files(folder, exts)
+
+
+def list_folder_files(folder: Path, extensions: Tuple[str, ...] = (),
+                      upper_lower=True) -> List[Path]:
+    """Return the sorted files of <folder> as in 'get_files_tree()'"""
+    return _list_files(folder, _extensions_set(extensions, upper_lower))
+
+
+def _list_files(folder: Path, exts: FrozenSet[str]) -> List[Path]:
+    """
+    --------------------------------------------------------------------------
+    Return the sorted files of <folder> with a suffix in <exts> (all the
+    files if empty) or an empty list if the folder can not be listed
+    --------------------------------------------------------------------------
+    """
+    files_found: List[Path] = []
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if exts and _suffix(entry.name) not in exts:
+                    continue
+                try:
+                    is_file = entry.is_file()
+                except OSError:
+                    is_file = False
+                if is_file:
+                    files_found.append(Path(entry.path))
+    except OSError:
+        return []
+    files_found.sort()
+    return files_found
+
+
+def _extensions_set(extensions: Tuple[str, ...], upper_lower=True
+                    ) -> FrozenSet[str]:
+    """Return the suffixes ('.ext') to match (empty for all the files)"""
+    for extension in extensions:
+        assert_txt = f"The extensions must not contain '.' <{extensions}>"
+        assert extension[0] != ".", assert_txt
+    exts = ["." + x for x in extensions]
+    if upper_lower:
+        exts = [x.upper() for x in exts] + [x.lower() for x in exts]
+    return frozenset(exts)
+
+
+def _suffix(name: str) -> str:
+    """Same as 'Path(name).suffix' for a plain file name"""
+    idx = name.rfind(".")
+    return name[idx:] if 0 < idx < len(name) - 1 else ""
+
+
+def get_folders_from_files(files_tree: Iterable[Path], check_files=True
+                           ) -> List[Path]:
+    """
+    --------------------------------------------------------------------------
+    - Get a list of ABSOLUTE folders for a given ABSOLUTE files tree (in order
+      of appearance, without duplicates)
+    - check_files: if disabled, the files are not checked to exist (no stat
+                   call per file)
+    --------------------------------------------------------------------------
+    """
+    # Files grouped by the parts of their folder (cheaper than building the
+    # '.parent' of every file); the final dict keeps 'Path' equality rules
+    first_files: Dict[Tuple[str, ...], Path] = {}
     for file in files_tree:
         assert file.is_absolute(), "'files_tree' must contain absolute paths."
-        assert file.is_file(), "'files_tree' must contain only file paths."
-        if file.parent not in paths2create:
-            paths2create.append(file.parent)
-    return paths2create
+        if check_files:
+            assert file.is_file(), "'files_tree' must contain only file paths."
+        first_files.setdefault(file.parts[:-1], file)
+    paths2create = dict.fromkeys(x.parent for x in first_files.values())
+    return list(paths2create)
+
+
+def get_leaf_folders_from_files(files_tree: Iterable[Path], check_files=True
+                                ) -> List[Path]:
+    """
+    --------------------------------------------------------------------------
+    Same as 'get_folders_from_files()' but without the folders that are a
+    parent of another one of the list: creating the leaf folders (with their
+    parents) creates all of them.
+    --------------------------------------------------------------------------
+    """
+    return _leaf_folders(get_folders_from_files(files_tree, check_files))
+
+
+def _leaf_folders(folders: List[Path]) -> List[Path]:
+    """Return the <folders> that are not a parent of another one (in order)"""
+    parents: Set[Path] = set()
+    for folder in folders:
+        for parent in folder.parents:
+            if parent in parents:
+                break
+            parents.add(parent)
+    return [x for x in folders if x not in parents]
 
 
 def replicate_folders_in_path(relative_dirs2create: List[Path],
                               destination_path: Path,
                               logger: Optional[Logger] = None,
-                              log_header: str = "") -> List[Path]:
+                              log_header: str = "", workers=1) -> List[Path]:
     """
     --------------------------------------------------------------------------
     Create all the RELATIVE folders in <relative_dirs2create> into the
     <destination_path>
     - 'logger' to include a process log
     - 'log_header' to add a header before the message log
+    - 'workers' to create the top-level subtrees in parallel threads
+    - Returns the folders of the list created (in order; a folder already
+      created as parent of a previous one of the list is not included)
     --------------------------------------------------------------------------
     """
+    rel_folders = list(relative_dirs2create)
+    created = _make_tree(_required_folders(rel_folders), destination_path,
+                         workers)
+
     folders_created: List[Path] = []
-    for rel_folder in relative_dirs2create:
-        new_folder = destination_path.joinpath(rel_folder)
-        if not new_folder.exists():
-            os.makedirs(new_folder)
+    claimed: Set[Path] = set()
+    for rel_folder in rel_folders:
+        if rel_folder in created and rel_folder not in claimed:
             folders_created.append(rel_folder)
             if logger is not None:
                 hdr = log_header if log_header else "Folder created:"
                 logger.info(hdr + " %s", rel_folder)
+        for folder in (rel_folder, *rel_folder.parents):
+            if folder in claimed:
+                break
+            claimed.add(folder)
     return folders_created
 
 
+def _required_folders(rel_folders: List[Path]) -> List[Path]:
+    """Return the folders (with all their parents) sorted parents first"""
+    required: Set[Path] = set()
+    for folder in _leaf_folders(list(dict.fromkeys(rel_folders))):
+        for parent in (folder, *folder.parents):
+            if parent in required:
+                break
+            required.add(parent)
+    return sorted(required, key=lambda x: len(x.parts))
+
+
+def _make_tree(rel_folders: List[Path], destination_path: Path, workers=1
+               ) -> Set[Path]:
+    """
+    --------------------------------------------------------------------------
+    Create the <rel_folders> (sorted parents first) in <destination_path>
+    with one 'mkdir' per folder and return the ones created (the existing
+    ones raise FileExistsError, so there is no 'exists()' check to race).
+    --------------------------------------------------------------------------
+    """
+    created: Set[Path] = set()
+    if rel_folders and not os.path.isdir(destination_path):
+        os.makedirs(destination_path, exist_ok=True)
+        created.add(Path("."))
+
+    subtrees: Dict[str, List[Path]] = {}
+    for folder in rel_folders:
+        if folder.parts:
+            subtrees.setdefault(folder.parts[0], []).append(folder)
+
+    def make(folders: List[Path]) -> List[Path]:
+        made = []
+        for folder in folders:
+            try:
+                os.mkdir(destination_path.joinpath(folder))
+            except FileExistsError:
+                continue
+            made.append(folder)
+        return made
+
+    if workers > 1 and len(subtrees) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for made in pool.map(make, subtrees.values()):
+                created.update(made)
+    else:
+        for folders in subtrees.values():
+            created.update(make(folders))
+    return created
+
+
 def move_files2destination(files_relative_tree: List[Path],
                            src_parent_folder: Path,
                            dst_parent_folder: Path,
@@ -174,3 +411,569 @@ def move_files2destination(files_relative_tree: List[Path],
             hdr = log_header if log_header else "File moved:"
             logger.info(hdr + " %s", file)
     return files_moved
+
+
+class MoveReport(NamedTuple):
+    """
+    --------------------------------------------------------------------------
+    Result of 'move_files2destination_batch()':
+    - moved: relative files moved (input order)
+    - failed: relative files not moved and the error
+    - renamed/copied: files moved with a rename (same device) or copied
+    - bytes_copied: bytes copied between devices
+    - seconds: elapsed time
+    --------------------------------------------------------------------------
+    """
+    moved: List[Path]
+    failed: List[Tuple[Path, str]]
+    renamed: int
+    copied: int
+    bytes_copied: int
+    seconds: float
+
+    @property
+    def files_per_second(self) -> float:
+        """Moved files per second"""
+        return len(self.moved) / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Copied bytes per second (moves between devices)"""
+        return self.bytes_copied / self.seconds if self.seconds else 0.0
+
+
+def move_files2destination_batch(files_relative_tree: List[Path],
+                                 src_parent_folder: Path,
+                                 dst_parent_folder: Path, workers=4,
+                                 logger: Optional[Logger] = None,
+                                 log_header: str = "") -> MoveReport:
+    """
+    --------------------------------------------------------------------------
+    Batch version of 'move_files2destination()' (same assertions and logs):
+    - All the files are checked at once before moving anything, listing
+      every source and destination folder only once
+    - Files in the same device are moved with 'rename_noreplace()', so a
+      target created after the checks is never overwritten (failed move)
+    - Files between devices are copied by a pool of <workers> threads
+      (kernel copy with 'os.copy_file_range()' / 'os.sendfile()' where
+      available), synced to disk and then removed from the origin
+    - Failed moves do not stop the batch, they are returned in the report
+    --------------------------------------------------------------------------
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+    t_start = time.perf_counter()
+    files = list(files_relative_tree)
+    _check_moves(files, src_parent_folder, dst_parent_folder)
+
+    devices: Dict[Path, int] = {}
+    outcomes: Dict[Path, Tuple[str, int, str]] = {}
+    copies: List[Path] = []
+    for file in files:
+        origin_file = src_parent_folder.joinpath(file)
+        destiny_file = dst_parent_folder.joinpath(file)
+        src_device = _device(origin_file.parent, devices)
+        if src_device == _device(destiny_file.parent, devices):
+            try:
+                rename_noreplace(origin_file, destiny_file)
+            except OSError as error:
+                if error.errno != errno.EXDEV:
+                    outcomes[file] = ("failed", 0, str(error))
+                    continue
+            else:
+                outcomes[file] = ("renamed", 0, "")
+                continue
+        copies.append(file)
+
+    def move(file: Path) -> Tuple[str, int, str]:
+        try:
+            size = _move_by_copy(src_parent_folder.joinpath(file),
+                                 dst_parent_folder.joinpath(file))
+        except OSError as error:
+            return "failed", 0, str(error)
+        return "copied", size, ""
+
+    if copies:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes.update(zip(copies, pool.map(move, copies)))
+
+    moved = [x for x in files if outcomes[x][0] != "failed"]
+    failed = [(x, outcomes[x][2]) for x in files if outcomes[x][0] == "failed"]
+    if logger is not None:
+        hdr = log_header if log_header else "File moved:"
+        for file in moved:
+            logger.info(hdr + " %s", file)
+        for file, reason in failed:
+            logger.warning("Move failed: %s (%s)", file, reason)
+    statuses = [x[0] for x in outcomes.values()]
+    return MoveReport(moved, failed, statuses.count("renamed"),
+                      statuses.count("copied"),
+                      sum(x[1] for x in outcomes.values()),
+                      time.perf_counter() - t_start)
+
+
+def _check_moves(files: List[Path], src_parent_folder: Path,
+                 dst_parent_folder: Path):
+    """
+    --------------------------------------------------------------------------
+    Assert (as 'move_files2destination()') that all the files exist in the
+    origin and none in the destination (nor twice in the batch) listing
+    every folder only once
+    --------------------------------------------------------------------------
+    """
+    err1 = "All files to move must exist in Origin: "
+    err2 = "All files to move must NOT exist in Destination: "
+    src_files: Dict[Path, Set[str]] = {}
+    dst_names: Dict[Path, Set[str]] = {}
+    for file in files:
+        origin_file = src_parent_folder.joinpath(file)
+        destiny_file = dst_parent_folder.joinpath(file)
+        if origin_file.parent not in src_files:
+            src_files[origin_file.parent] = _list_file_names(
+                origin_file.parent)
+        if destiny_file.parent not in dst_names:
+            dst_names[destiny_file.parent] = _list_names(destiny_file.parent)
+        assert origin_file.name in src_files[origin_file.parent], \
+            err1 + str(file)
+        assert destiny_file.name not in dst_names[destiny_file.parent], \
+            err2 + str(file)
+        dst_names[destiny_file.parent].add(destiny_file.name)
+
+
+def _list_file_names(folder: Path) -> Set[str]:
+    """Return the names of the files in the folder (symlinks followed)"""
+    names: Set[str] = set()
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file():
+                        names.add(entry.name)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return names
+
+
+def _device(folder: Path, devices: Dict[Path, int]) -> int:
+    """Return (cached in <devices>) the device id of the <folder>"""
+    if folder not in devices:
+        try:
+            devices[folder] = os.stat(folder).st_dev
+        except OSError:
+            devices[folder] = -1
+    return devices[folder]
+
+
+def _move_by_copy(source: Path, target: Path) -> int:
+    """
+    --------------------------------------------------------------------------
+    Move <source> to <target> (never overwritten) in another device: copy
+    the data and metadata, sync it to disk and remove the source. Return
+    the bytes copied. A partial target is removed if the copy fails or does
+    not copy the whole source (the source is then kept).
+    --------------------------------------------------------------------------
+    """
+    with open(source, "rb") as fsrc:
+        with open(target, "xb") as fdst:
+            try:
+                size = _copy_data(fsrc.fileno(), fdst.fileno())
+                expected = os.fstat(fsrc.fileno()).st_size
+                if size != expected:
+                    raise OSError(errno.EIO, f"Incomplete copy ({size} of "
+                                  f"{expected} bytes)", os.fspath(source))
+                fdst.flush()
+                shutil.copystat(source, target)
+                os.fsync(fdst.fileno())
+            except BaseException:
+                fdst.close()
+                os.unlink(target)
+                raise
+    os.unlink(source)
+    return size
+
+
+def _copy_data(src_fd: int, dst_fd: int) -> int:
+    """
+    --------------------------------------------------------------------------
+    Copy all the data between file descriptors returning the bytes copied.
+    The kernel copies ('copy_file_range()', then 'sendfile()') are used if
+    the system supports them for this pair of files, with fallback to a
+    buffered copy. A kernel copy copying nothing at all is not trusted as
+    the end of the file (some filesystems report 0 bytes instead of an
+    error) and the next method is tried.
+    --------------------------------------------------------------------------
+    """
+    chunk = 1 << 30
+    copiers = []
+    if hasattr(os, "copy_file_range"):
+        copiers.append(lambda copied: os.copy_file_range(src_fd, dst_fd,
+                                                         chunk))
+    if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+        copiers.append(lambda copied: os.sendfile(dst_fd, src_fd, copied,
+                                                  chunk))
+    for copier in copiers:
+        copied = 0
+        try:
+            while True:
+                sent = copier(copied)
+                if not sent:
+                    break
+                copied += sent
+        except OSError as error:
+            if copied or error.errno not in _NO_KERNEL_COPY:
+                raise
+        if copied:
+            return copied
+
+    copied = 0
+    buffer = bytearray(_COPY_BUFFER)
+    view = memoryview(buffer)
+    while True:
+        read = os.readv(src_fd, [buffer])
+        if not read:
+            return copied
+        written = 0
+        while written < read:
+            written += os.write(dst_fd, view[written:read])
+        copied += read
+
+
+class RenameOperation(NamedTuple):
+    """Single rename of a <RenamePlan>: <source> -> <target>"""
+    source: Path
+    target: Path
+
+
+class RenameOutcome(NamedTuple):
+    """
+    --------------------------------------------------------------------------
+    Result of a file in a batch rename. Status values:
+    - 'renamed':   renamed in this run
+    - 'planned':   dry-run, the rename would be done
+    - 'journaled': already renamed by a previous (interrupted) run
+    - 'exists':    skipped, the target already exists
+    - 'unchanged': skipped, no rename is needed for the file
+    - 'restored':  rename undone by a rollback
+    - 'failed':    the rename raised an error (see 'error')
+    --------------------------------------------------------------------------
+    """
+    source: Path
+    target: Path
+    status: str
+    error: str = ""
+
+
+class RenamePlan:
+    """
+    --------------------------------------------------------------------------
+    List of renames computed in memory (targets are already unique) that can
+    be executed or dry-run with 'execute()' / 'run()'.
+    --------------------------------------------------------------------------
+    """
+    def __init__(self, operations: Iterable[RenameOperation] = ()):
+        self.operations: List[RenameOperation] = list(operations)
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+    def __iter__(self):
+        return iter(self.operations)
+
+    def execute(self, dry_run=False, logger: Optional[Logger] = None,
+                log_header: str = "") -> List[RenameOperation]:
+        """
+        ----------------------------------------------------------------------
+        Execute the renames of the plan and return the ones done. A target
+        created by someone else after planning is never overwritten (that
+        rename is skipped).
+        - 'dry_run' to only return (and log) the plan without touching disk
+        - 'logger' to include a process log
+        - 'log_header' to add a header before the message log
+        ----------------------------------------------------------------------
+        """
+        outcomes = self.run(dry_run, logger=logger, log_header=log_header)
+        return [RenameOperation(x.source, x.target) for x in outcomes
+                if x.status in ("renamed", "planned")]
+
+    def run(self, dry_run=False, workers=1, journal: Optional[Path] = None,
+            logger: Optional[Logger] = None,
+            log_header: str = "") -> List[RenameOutcome]:
+        """
+        ----------------------------------------------------------------------
+        Execute the renames of the plan and return an outcome per operation
+        (in plan order, see 'RenameOutcome').
+        - 'dry_run' to only return (and log) the plan without touching disk
+        - 'workers' number of threads renaming in parallel
+        - 'journal' append-only file (JSON lines) recording every rename. If
+          it exists, the renames recorded there are not repeated (resume of
+          an interrupted run) and it can be undone with 'rollback_journal()'
+        - 'logger' to include a process log
+        - 'log_header' to add a header before the message log
+        ----------------------------------------------------------------------
+        """
+        done = read_journal(journal)[0] if journal is not None else {}
+        writer = None
+        if journal is not None and not dry_run:
+            writer = _JournalWriter(journal)
+
+        def rename(operation: RenameOperation) -> RenameOutcome:
+            key = (str(operation.source), str(operation.target))
+            if key in done and (done[key] == "done" or _is_renamed(*key)):
+                return RenameOutcome(*operation, "journaled")
+            if dry_run:
+                return RenameOutcome(*operation, "planned")
+            if writer is not None:
+                writer.write("begin", *key)
+            try:
+                rename_noreplace(operation.source, operation.target)
+            except FileExistsError:
+                return RenameOutcome(*operation, "exists")
+            except OSError as error:
+                return RenameOutcome(*operation, "failed", str(error))
+            if writer is not None:
+                writer.write("done", *key)
+            return RenameOutcome(*operation, "renamed")
+
+        try:
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    outcomes = list(pool.map(rename, self.operations))
+            else:
+                outcomes = [rename(x) for x in self.operations]
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if logger is not None:
+            _log_outcomes(outcomes, logger, log_header)
+        return outcomes
+
+
+class _JournalWriter:
+    """Thread-safe append-only writer of a rename journal (JSON lines)"""
+    def __init__(self, journal: Path):
+        # pylint: disable=consider-using-with
+        self._file = open(journal, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, event: str, source: str, target: str):
+        """Append and flush an event of the rename <source> -> <target>"""
+        line = json.dumps({"event": event, "source": source,
+                           "target": target}) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        """Sync the journal to disk and close it"""
+        with self._lock:
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+
+def read_journal(journal: Path) -> Tuple[Dict[Tuple[str, str], str],
+                                         List[Tuple[str, str]]]:
+    """
+    --------------------------------------------------------------------------
+    Return the last event of every rename (source, target) in the <journal>
+    ('begin', 'done' or 'undone') and the renames currently done in the
+    order they were last done (a rename done again after a rollback is
+    listed once, in its last position). A missing journal is empty and a
+    truncated last line (crash while writing) is ignored.
+    --------------------------------------------------------------------------
+    """
+    events: Dict[Tuple[str, str], str] = {}
+    order: Dict[Tuple[str, str], None] = {}
+    if not os.path.exists(journal):
+        return events, []
+    with open(journal, encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            key = (record["source"], record["target"])
+            events[key] = record["event"]
+            if record["event"] in ("done", "undone"):
+                order.pop(key, None)
+            if record["event"] == "done":
+                order[key] = None
+    return events, list(order)
+
+
+def rollback_journal(journal: Path, logger: Optional[Logger] = None,
+                     log_header: str = "") -> List[RenameOutcome]:
+    """
+    --------------------------------------------------------------------------
+    Undo (in reverse order) the renames recorded in the <journal> by
+    'RenamePlan.run()' and not undone yet, recording the undo in the journal
+    too. Renames interrupted between 'begin' and 'done' are undone if the
+    target exists and the source does not. A source created again after
+    the rename is never overwritten ('exists' outcome).
+    - 'logger' to include a process log
+    - 'log_header' to add a header before the message log
+    --------------------------------------------------------------------------
+    """
+    events, order = read_journal(journal)
+    pending = [x for x, event in events.items()
+               if event == "begin" and _is_renamed(*x)]
+    todo = order + pending
+    outcomes: List[RenameOutcome] = []
+    writer = _JournalWriter(journal)
+    try:
+        for source, target in reversed(todo):
+            try:
+                rename_noreplace(Path(target), Path(source))
+            except FileExistsError:
+                outcomes.append(RenameOutcome(Path(source), Path(target),
+                                              "exists"))
+                continue
+            except OSError as error:
+                outcomes.append(RenameOutcome(Path(source), Path(target),
+                                              "failed", str(error)))
+                continue
+            writer.write("undone", source, target)
+            outcomes.append(RenameOutcome(Path(source), Path(target),
+                                          "restored"))
+    finally:
+        writer.close()
+
+    if logger is not None:
+        _log_outcomes(outcomes, logger, log_header)
+    return outcomes
+
+
+def _log_outcomes(outcomes: Iterable[RenameOutcome], logger: Logger,
+                  log_header: str):
+    """Log the outcomes of a batch rename in order"""
+    headers = {"renamed": "File renamed:", "planned": "Rename planned:",
+               "restored": "Rename undone:"}
+    for outcome in outcomes:
+        if outcome.status == "failed":
+            logger.warning("Rename failed: %s -> %s (%s)",
+                           outcome.source.name, outcome.target.name,
+                           outcome.error)
+        elif outcome.status in headers:
+            hdr = log_header if log_header else headers[outcome.status]
+            logger.info(hdr + " %s -> %s", outcome.source.name,
+                        outcome.target.name)
+
+
+def _is_renamed(source: Union[str, Path], target: Union[str, Path]) -> bool:
+    """Return if the rename of <source> to <target> is already done"""
+    return not os.path.lexists(source) and os.path.lexists(target)
+
+
+def rename_noreplace(source: Path, target: Path):
+    """
+    --------------------------------------------------------------------------
+    Rename <source> to <target> raising FileExistsError if <target> exists
+    instead of overwriting it. A hard link + unlink is used so the check is
+    atomic, with fallback to 'exists()' + 'os.rename()' where the filesystem
+    does not support hard links.
+    --------------------------------------------------------------------------
+    """
+    try:
+        os.link(source, target)
+    except FileExistsError:
+        raise
+    except OSError:
+        if os.path.lexists(target):
+            raise FileExistsError(f"File already exists: {target}") from None
+        os.rename(source, target)
+        return
+    os.unlink(source)
+
+
+class NameAllocator:
+    """
+    --------------------------------------------------------------------------
+    Batch version of 'itername()' for the files of a <folder>: the folder is
+    listed only once and every allocated name is reserved, so names handed
+    out in the same batch (even from several threads) never collide.
+    - separator/idx: as in 'itername()', the first free
+      '{stem}{separator}{count}{suffix}' with count >= idx is returned
+    - names: [optional] names already in the folder (to skip the listing)
+    --------------------------------------------------------------------------
+    - The next count to try is kept per (stem, suffix) and only moves
+      forward (names are never released), so a series of N collisions of
+      the same name costs O(N) in total instead of O(N^2) 'exists()' calls.
+    --------------------------------------------------------------------------
+    """
+    def __init__(self, folder: Path, separator="-", idx=1,
+                 names: Optional[Iterable[str]] = None):
+        self.folder = folder
+        self.separator = separator
+        self.idx = idx
+        self._taken: Set[str] = set(_list_names(folder) if names is None
+                                    else names)
+        self._next: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._taken
+
+    def reserve(self, name: str) -> bool:
+        """Reserve the <name> returning False if it was already taken"""
+        with self._lock:
+            if name in self._taken:
+                return False
+            self._taken.add(name)
+            return True
+
+    def allocate(self, name: str) -> str:
+        """Return (and reserve) the free name for <name>"""
+        with self._lock:
+            if name not in self._taken:
+                self._taken.add(name)
+                return name
+            sfix = _suffix(name)
+            stem = name[:-len(sfix)] if sfix else name
+            count = self._next.get((stem, sfix), self.idx)
+            new_name = stem + self.separator + f"{count}" + sfix
+            while new_name in self._taken:
+                count += 1
+                new_name = stem + self.separator + f"{count}" + sfix
+            self._next[(stem, sfix)] = count + 1
+            self._taken.add(new_name)
+            return new_name
+
+    def allocate_path(self, file: Path) -> Path:
+        """Return (and reserve) the free path in the folder for <file>"""
+        return self.folder.joinpath(self.allocate(file.name))
+
+
+def plan_ekdin2kdin_renames(files: Iterable[Path], year_bounds=(1800, 2300),
+                            separator="-", idx=1) -> RenamePlan:
+    """
+    --------------------------------------------------------------------------
+    Plan the rename of all the Kjmaro EKDIN files to KDIN (see
+    'conventions.file_ekdin2kdin()') listing every destination folder only
+    once. Collisions (with existing files or between files of the batch) are
+    solved in memory as in 'itername()' adding '{separator}{count}'.
+    Files not following the EKDIN convention are not included in the plan.
+    --------------------------------------------------------------------------
+    """
+    allocators: Dict[Path, NameAllocator] = {}
+    operations: List[RenameOperation] = []
+    for file in dict.fromkeys(files):
+        match = conventions.classify_filename(file, year_bounds, False)
+        if match.kind != "EKDIN":
+            continue
+        target = conventions.file_ekdin2kdin(file, year_bounds)
+        if target.parent not in allocators:
+            allocators[target.parent] = NameAllocator(target.parent,
+                                                      separator, idx)
+        new_path = allocators[target.parent].allocate_path(target)
+        operations.append(RenameOperation(file, new_path))
+    return RenamePlan(operations)
+
+
+def _list_names(folder: Path) -> Set[str]:
+    """Return the names in the folder (empty if it can not be listed)"""
+    try:
+        return set(os.listdir(folder))
+    except OSError:
+        return set()
@@ -0,0 +1,249 @@
+"""Batch file hashing with a persistent cache of the digests"""
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+from typing import Tuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import sqlite3
+import json
+import time
+import os
+
+from . import ostools
+
+StatKey = Tuple[int, int, int, int]  # st_dev, st_ino, st_size, st_mtime_ns
+_CACHE_FLUSH = 1000
+# Files modified less than this before being hashed are not cached (a write
+# in the same mtime tick would keep the key of the hashed content)
+_RACY_NS = 2_000_000_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    dev INTEGER, ino INTEGER, size INTEGER, mtime_ns INTEGER,
+    digests TEXT, used INTEGER,
+    PRIMARY KEY (dev, ino, size, mtime_ns));
+CREATE INDEX IF NOT EXISTS hashes_used ON hashes (used);
+"""
+
+
+class HashCache:
+    """
+    --------------------------------------------------------------------------
+    Digests of files stored in a SQLite <database> keyed by the device,
+    inode, size and mtime_ns of the file: a file whose key did not change is
+    never read again. Up to <max_entries> files are kept (the least recently
+    used ones are evicted).
+    --------------------------------------------------------------------------
+    """
+    def __init__(self, database: Path, max_entries=1_000_000):
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(os.fspath(database))
+        self._conn.executescript(_SCHEMA)
+        row = self._conn.execute("SELECT MAX(used) FROM hashes").fetchone()
+        self._used = row[0] or 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        row = self._conn.execute("SELECT COUNT(*) FROM hashes").fetchone()
+        return row[0]
+
+    def close(self):
+        """Close the database"""
+        self._conn.close()
+
+    def get(self, key: StatKey) -> Dict[str, str]:
+        """Return the cached digests of a file key (empty if not cached)"""
+        row = self._conn.execute(
+            "SELECT digests FROM hashes WHERE dev = ? AND ino = ? AND "
+            "size = ? AND mtime_ns = ?", key).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def put_many(self, items: Iterable[Tuple[StatKey, Dict[str, str]]]):
+        """Store the digests of the file keys (merged with the cached ones)"""
+        rows = []
+        for key, digests in items:
+            self._used += 1
+            rows.append((*key, json.dumps({**self.get(key), **digests}),
+                         self._used))
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)",
+                rows)
+        self.evict()
+
+    def touch_many(self, keys: Iterable[StatKey]):
+        """Mark the file keys as used (for the eviction order)"""
+        rows = []
+        for key in keys:
+            self._used += 1
+            rows.append((self._used, *key))
+        with self._conn:
+            self._conn.executemany(
+                "UPDATE hashes SET used = ? WHERE dev = ? AND ino = ? AND "
+                "size = ? AND mtime_ns = ?", rows)
+
+    def invalidate(self, files: Iterable[Path]):
+        """Remove the cached digests of the files (any size or mtime)"""
+        rows = []
+        for file in files:
+            try:
+                stat = os.stat(file)
+            except OSError:
+                continue
+            rows.append((stat.st_dev, stat.st_ino))
+        with self._conn:
+            self._conn.executemany(
+                "DELETE FROM hashes WHERE dev = ? AND ino = ?", rows)
+
+    def clear(self):
+        """Remove all the cached digests"""
+        with self._conn:
+            self._conn.execute("DELETE FROM hashes")
+
+    def evict(self):
+        """Remove the least recently used entries over <max_entries>"""
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM hashes WHERE rowid IN (SELECT rowid FROM "
+                    "hashes ORDER BY used LIMIT ?)", (excess,))
+
+
+class BatchHashes(NamedTuple):
+    """
+    --------------------------------------------------------------------------
+    Result of 'hash_files()':
+    - digests: {file: {algorithm: hexdigest}}
+    - failed: {file: error} of the files that could not be read
+    - cached/hashed: number of files taken from the cache / read
+    --------------------------------------------------------------------------
+    """
+    digests: Dict[Path, Dict[str, str]]
+    failed: Dict[Path, str]
+    cached: int
+    hashed: int
+
+
+def hash_files(files: Iterable[Path], algorithms: Tuple[str, ...] = ("md5",),
+               cache: Optional[HashCache] = None,
+               workers: Optional[int] = None, io_bound=True, buffer=2**20,
+               progress: Optional[Callable[[float, str], object]] = None
+               ) -> BatchHashes:
+    """
+    --------------------------------------------------------------------------
+    Return the digests (see 'ostools.file_checksums()') of all the <files>
+    hashing them in a pool of processes. Files in the <cache> with the same
+    device, inode, size and mtime_ns are not read (files modified in the
+    last seconds are hashed but not cached).
+    - workers: number of processes (default: 2 per core if <io_bound>, as
+               processes wait for the disk, or 1 per core otherwise)
+    - io_bound: files are sent one by one to the processes (disk bound) or
+                in chunks (CPU bound: small files in fast disks)
+    - progress: called as 'progress(uni_value, text)' after every file,
+                e.g. 'logtools.progress' (with print_result=True)
+    --------------------------------------------------------------------------
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+    files = list(dict.fromkeys(files))
+    digests: Dict[Path, Dict[str, str]] = {}
+    failed: Dict[Path, str] = {}
+    misses: List[Tuple[Path, StatKey]] = []
+    hits: List[StatKey] = []
+    for file in files:
+        try:
+            key = _stat_key(os.stat(file))
+        except OSError as error:
+            failed[file] = str(error)
+            continue
+        cached = cache.get(key) if cache is not None else {}
+        if all(x in cached for x in algorithms):
+            digests[file] = {x: cached[x] for x in algorithms}
+            hits.append(key)
+        else:
+            misses.append((file, key))
+    if cache is not None:
+        cache.touch_many(hits)
+
+    total = len(files)
+    done = total - len(misses)
+    if progress is not None and done:
+        progress(done / total, f"{done} files in cache")
+
+    if workers is None:
+        workers = (os.cpu_count() or 1) * (2 if io_bound else 1)
+    chunksize = 1 if io_bound else max(1, len(misses) // (workers * 4))
+    args = [(x, key, algorithms, buffer) for x, key in misses]
+    if workers > 1 and len(misses) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_hash_file, args, chunksize=chunksize)
+            _collect(results, misses, digests, failed, cache, progress,
+                     done, total)
+    else:
+        _collect(map(_hash_file, args), misses, digests, failed, cache,
+                 progress, done, total)
+    return BatchHashes({x: digests[x] for x in files if x in digests},
+                       failed, len(hits), len(misses))
+
+
+def _collect(results: Iterable[Tuple[Dict[str, str], str, bool]],
+             misses: List[Tuple[Path, StatKey]],
+             digests: Dict[Path, Dict[str, str]], failed: Dict[Path, str],
+             cache: Optional[HashCache],
+             progress: Optional[Callable[[float, str], object]],
+             done: int, total: int):
+    """
+    --------------------------------------------------------------------------
+    Store the results of the hashed files as they are received (saved in
+    the cache every '_CACHE_FLUSH' files so an interrupted batch is not lost)
+    --------------------------------------------------------------------------
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    to_cache: List[Tuple[StatKey, Dict[str, str]]] = []
+    for (file, key), (file_digests, error, unchanged) in zip(misses,
+                                                             results):
+        if error:
+            failed[file] = error
+        else:
+            digests[file] = file_digests
+            if unchanged and cache is not None:
+                to_cache.append((key, file_digests))
+                if len(to_cache) >= _CACHE_FLUSH:
+                    cache.put_many(to_cache)
+                    to_cache = []
+        done += 1
+        if progress is not None:
+            progress(done / total, file.name)
+    if cache is not None and to_cache:
+        cache.put_many(to_cache)
+
+
+def _hash_file(args: Tuple[Path, StatKey, Tuple[str, ...], int]
+               ) -> Tuple[Dict[str, str], str, bool]:
+    """
+    --------------------------------------------------------------------------
+    Return the digests of a file, the error (if any) and if the digests can
+    be cached: the file was not modified while hashing (same key after
+    reading it) nor in the '_RACY_NS' before (a later write could keep the
+    same mtime in filesystems with coarse timestamps)
+    --------------------------------------------------------------------------
+    """
+    file, key, algorithms, buffer = args
+    hash_ns = time.time_ns()
+    try:
+        file_digests = ostools.file_checksums(file, algorithms, buffer)
+        unchanged = _stat_key(os.stat(file)) == key and \
+            hash_ns - key[3] >= _RACY_NS
+    except OSError as error:
+        return {}, str(error), False
+    return file_digests, "", unchanged
+
+
+def _stat_key(stat: os.stat_result) -> StatKey:
+    """Return the cache key of a file stat"""
+    return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
@@ -1,9 +1,13 @@
 """tools related with the operative system"""
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
 from pathlib import Path
 import datetime
 import hashlib
+import mmap
 import os
 
+DateOrNs = Union[datetime.datetime, int]
+
 
 def get_file_create_date(filepath: Path) -> datetime.datetime:
     """get the file creation date"""
@@ -22,20 +26,130 @@ def get_file_access_date(filepath: Path) -> datetime.datetime:
 
 def set_file_modify_date(filepath: Path, date: datetime.datetime):
     """set the file modify date immediately"""
-    st_atime = os.stat(filepath).st_atime
-    os.utime(filepath, (st_atime, int(datetime.datetime.timestamp(date))))
+    set_file_times(filepath, mtime=date)
 
 
 def set_file_access_date(filepath: Path, date: datetime.datetime):
     """set the file access date immediately"""
-    st_mtime = os.stat(filepath).st_mtime
-    os.utime(filepath, (int(datetime.datetime.timestamp(date)), st_mtime))
+    set_file_times(filepath, atime=date)
+
+
+class FileTimes(NamedTuple):
+    """Dates of a file (as the 'get_file_*_date()' functions)"""
+    create: datetime.datetime
+    modify: datetime.datetime
+    access: datetime.datetime
+
+
+def stat_times(paths: Iterable[Union[Path, os.DirEntry]]
+               ) -> List[Optional[FileTimes]]:
+    """
+    --------------------------------------------------------------------------
+    return the create/modify/access dates of all the paths with one stat per
+    path (None for the paths that can not be accessed). 'os.DirEntry' items
+    of a scan reuse its stat (free in Windows, cached for later calls).
+    --------------------------------------------------------------------------
+    """
+    fromtimestamp = datetime.datetime.fromtimestamp
+    times: List[Optional[FileTimes]] = []
+    for path in paths:
+        try:
+            stat = path.stat() if isinstance(path, os.DirEntry) else \
+                os.stat(path)
+        except OSError:
+            times.append(None)
+            continue
+        times.append(FileTimes(fromtimestamp(stat.st_ctime),
+                               fromtimestamp(stat.st_mtime),
+                               fromtimestamp(stat.st_atime)))
+    return times
+
+
+def set_file_times(filepath: Path, atime: Optional[DateOrNs] = None,
+                   mtime: Optional[DateOrNs] = None):
+    """
+    --------------------------------------------------------------------------
+    set the access and/or modify times of the file with nanosecond precision
+    and one 'os.utime()' call (plus one stat only if one of them is None to
+    keep its current value). Times are datetimes or integer nanoseconds.
+    --------------------------------------------------------------------------
+    """
+    if atime is None and mtime is None:
+        return
+    if atime is None or mtime is None:
+        stat = os.stat(filepath)
+        atime = stat.st_atime_ns if atime is None else atime
+        mtime = stat.st_mtime_ns if mtime is None else mtime
+    os.utime(filepath, ns=(_to_ns(atime), _to_ns(mtime)))
+
+
+def set_files_times(items: Iterable[Tuple[Path, Optional[DateOrNs],
+                                          Optional[DateOrNs]]]
+                    ) -> Dict[Path, str]:
+    """
+    --------------------------------------------------------------------------
+    batch version of 'set_file_times()' for (filepath, atime, mtime) items;
+    return the errors of the files that could not be updated
+    --------------------------------------------------------------------------
+    """
+    failed: Dict[Path, str] = {}
+    for filepath, atime, mtime in items:
+        try:
+            set_file_times(filepath, atime, mtime)
+        except OSError as error:
+            failed[filepath] = str(error)
+    return failed
+
+
+def datetime2ns(date: datetime.datetime) -> int:
+    """return the POSIX time in nanoseconds of the date (without rounding)"""
+    seconds = int(date.replace(microsecond=0).timestamp())
+    return seconds * 1_000_000_000 + date.microsecond * 1000
+
+
+def _to_ns(value: DateOrNs) -> int:
+    """return the nanoseconds of a datetime or nanoseconds value"""
+    if isinstance(value, datetime.datetime):
+        return datetime2ns(value)
+    return value
 
 
 def md5checksum(filepath: Path, buffer=2**20) -> str:
     """return the MD5 value of the file"""
+    return file_checksums(filepath, ("md5",), buffer)["md5"]
+
+
+def file_checksums(filepath: Path, algorithms: Tuple[str, ...] = ("md5",),
+                   buffer=2**20, use_mmap=False) -> Dict[str, str]:
+    """
+    --------------------------------------------------------------------------
+    return the hex digests of the file for all the <algorithms> (hashlib
+    names such as 'md5', 'sha256', 'blake2b') reading the file only once
+    - buffer: size of the chunks (one buffer reused for all the reads)
+    - use_mmap: map the file in memory instead of reading it (large files)
+    --------------------------------------------------------------------------
+    """
+    hashes = [hashlib.new(x) for x in algorithms]
     with open(filepath, "rb") as fle:
-        hashmd5 = hashlib.md5()
-        while buff := fle.read(buffer):
-            hashmd5.update(buff)
-        return hashmd5.hexdigest()
+        if use_mmap:
+            _update_from_mmap(hashes, fle.fileno(), buffer)
+        else:
+            buff = bytearray(buffer)
+            with memoryview(buff) as view:
+                while size := fle.readinto(buff):
+                    for hsh in hashes:
+                        hsh.update(view[:size])
+    return {x: hsh.hexdigest() for x, hsh in zip(algorithms, hashes)}
+
+
+def _update_from_mmap(hashes: list, fileno: int, buffer: int):
+    """update the <hashes> with the mapped file in chunks of <buffer>"""
+    size = os.fstat(fileno).st_size
+    if not size:
+        return
+    with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mapped:
+        with memoryview(mapped) as view:
+            for start in range(0, size, buffer):
+                with view[start:start + buffer] as chunk:
+                    for hsh in hashes:
+                        hsh.update(chunk)
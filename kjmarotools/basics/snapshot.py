@@ -0,0 +1,227 @@
+"""Persistent snapshot of a folder tree for incremental rescans"""
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from pathlib import Path
+import sqlite3
+import time
+import os
+
+# Folders modified less than this before the scan are listed again in the
+# next scan (a change in the same mtime tick would not be detected)
+_RACY_NS = 2_000_000_000
+_RACY_MTIME = -1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY, parent TEXT, mtime_ns INTEGER);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, dir TEXT, size INTEGER, mtime_ns INTEGER,
+    inode INTEGER);
+CREATE INDEX IF NOT EXISTS files_dir ON files (dir);
+"""
+
+FileStat = Tuple[int, int, int]  # size, mtime_ns, inode
+
+
+class SnapshotScan(NamedTuple):
+    """
+    --------------------------------------------------------------------------
+    Result of 'TreeSnapshot.scan()':
+    - folders: same as 'filetools.get_folders_tree(base_folder)'
+    - files: files of the base_folder and of all the folders
+    - added/removed/modified: files changed since the previous scan
+    --------------------------------------------------------------------------
+    """
+    folders: List[Path]
+    files: List[Path]
+    added: List[Path]
+    removed: List[Path]
+    modified: List[Path]
+
+
+class TreeSnapshot:
+    """
+    --------------------------------------------------------------------------
+    Snapshot of a folder tree stored in a SQLite <database>: the mtime of
+    every folder and the size, mtime and inode of every file. A rescan only
+    lists again the folders whose mtime changed (a file added, removed or
+    renamed changes the mtime of its folder).
+    --------------------------------------------------------------------------
+    - A file modified in place does not change the mtime of its folder; use
+      'scan(check_files=True)' to also stat the files of unchanged folders.
+    - Symlinks to folders are not followed and folders that can not be
+      listed are ignored (as in 'filetools.get_folders_tree()').
+    --------------------------------------------------------------------------
+    """
+    def __init__(self, database: Path, base_folder: Path):
+        assert base_folder.is_absolute(), "'base_folder' must be absolute."
+        self.base_folder = base_folder
+        self._conn = sqlite3.connect(os.fspath(database))
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close the database"""
+        self._conn.close()
+
+    def scan(self, check_files=False) -> SnapshotScan:
+        """
+        ----------------------------------------------------------------------
+        Rescan the tree updating the snapshot and return the full tree and
+        the changes since the previous scan (all the files are 'added' in
+        the first scan). Raise ValueError if the base_folder can not be
+        listed (the snapshot is kept).
+        - check_files: stat the files of the unchanged folders too, to find
+                       files modified in place
+        ----------------------------------------------------------------------
+        """
+        # pylint: disable=too-many-locals
+        old_dirs, children = self._load_dirs()
+        old_files = self._load_files()
+        base = os.fspath(self.base_folder)
+        scan_ns = time.time_ns()
+
+        seen_dirs: Dict[str, Tuple[str, int]] = {}
+        files: Dict[str, Dict[str, FileStat]] = {}
+        relisted: Set[str] = set()
+        pending: List[Tuple[str, str]] = [(base, "")]
+        while pending:
+            folder, parent = pending.pop()
+            try:
+                mtime_ns = os.stat(folder).st_mtime_ns
+            except OSError:
+                continue
+            if scan_ns - mtime_ns < _RACY_NS:
+                stored_mtime = _RACY_MTIME
+            else:
+                stored_mtime = mtime_ns
+            if old_dirs.get(folder) == mtime_ns:
+                subdirs = children.get(folder, [])
+                dir_files = old_files.get(folder, {})
+                if check_files:
+                    dir_files = _stat_files(dir_files)
+                    if dir_files != old_files.get(folder, {}):
+                        relisted.add(folder)
+            else:
+                listing = _list_folder(folder)
+                if listing is None:
+                    continue
+                subdirs, dir_files = listing
+                relisted.add(folder)
+            seen_dirs[folder] = (parent, stored_mtime)
+            files[folder] = dir_files
+            pending.extend((x, folder) for x in subdirs)
+
+        if base not in seen_dirs:
+            # Not saved: an unmounted drive must not empty the snapshot
+            raise ValueError(f"{self.base_folder!r} can not be listed")
+        added, removed, modified = _delta(old_files, files)
+        self._save(old_dirs, seen_dirs, files, relisted)
+
+        folders = [Path(x) for x in seen_dirs if x != base]
+        folders.sort()
+        all_files = [Path(x) for y in files.values() for x in y]
+        all_files.sort()
+        return SnapshotScan(folders, all_files, added, removed, modified)
+
+    def _load_dirs(self) -> Tuple[Dict[str, int], Dict[str, List[str]]]:
+        """Return the folder mtimes and the subfolders of every folder"""
+        mtimes: Dict[str, int] = {}
+        children: Dict[str, List[str]] = {}
+        for path, parent, mtime_ns in self._conn.execute(
+                "SELECT path, parent, mtime_ns FROM dirs"):
+            mtimes[path] = mtime_ns
+            children.setdefault(parent, []).append(path)
+        return mtimes, children
+
+    def _load_files(self) -> Dict[str, Dict[str, FileStat]]:
+        """Return the stats of the files grouped by folder"""
+        files: Dict[str, Dict[str, FileStat]] = {}
+        for path, folder, size, mtime_ns, inode in self._conn.execute(
+                "SELECT path, dir, size, mtime_ns, inode FROM files"):
+            files.setdefault(folder, {})[path] = (size, mtime_ns, inode)
+        return files
+
+    def _save(self, old_dirs: Dict[str, int],
+              seen_dirs: Dict[str, Tuple[str, int]],
+              files: Dict[str, Dict[str, FileStat]], relisted: Set[str]):
+        """Store the folders whose mtime or files changed"""
+        gone = [(x,) for x in old_dirs if x not in seen_dirs]
+        changed = [(x, *y) for x, y in seen_dirs.items()
+                   if x in relisted or old_dirs.get(x) != y[1]]
+        with self._conn:
+            self._conn.executemany("DELETE FROM dirs WHERE path = ?", gone)
+            self._conn.executemany("DELETE FROM files WHERE dir = ?", gone)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)", changed)
+            for folder in relisted:
+                self._conn.execute("DELETE FROM files WHERE dir = ?",
+                                   (folder,))
+                self._conn.executemany(
+                    "INSERT INTO files VALUES (?, ?, ?, ?, ?)",
+                    [(x, folder, *y) for x, y in files[folder].items()])
+
+
+def _list_folder(folder: str) -> Optional[Tuple[List[str],
+                                                Dict[str, FileStat]]]:
+    """
+    --------------------------------------------------------------------------
+    Return the subfolders and the stats of the files of <folder> or None if
+    it can not be listed
+    --------------------------------------------------------------------------
+    """
+    subdirs: List[str] = []
+    files: Dict[str, FileStat] = {}
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        files[entry.path] = (stat.st_size, stat.st_mtime_ns,
+                                             stat.st_ino)
+                except OSError:
+                    continue
+    except OSError:
+        return None
+    return subdirs, files
+
+
+def _stat_files(files: Dict[str, FileStat]) -> Dict[str, FileStat]:
+    """Return the current stats of the <files> (without the missing ones)"""
+    current: Dict[str, FileStat] = {}
+    for path in files:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        current[path] = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+    return current
+
+
+def _delta(old_files: Dict[str, Dict[str, FileStat]],
+           new_files: Dict[str, Dict[str, FileStat]]
+           ) -> Tuple[List[Path], List[Path], List[Path]]:
+    """Return the sorted added, removed and modified files"""
+    added: List[Path] = []
+    removed: List[Path] = []
+    modified: List[Path] = []
+    for folder in set(old_files) | set(new_files):
+        old = old_files.get(folder, {})
+        new = new_files.get(folder, {})
+        if old is new:
+            continue
+        added += [Path(x) for x in new if x not in old]
+        removed += [Path(x) for x in old if x not in new]
+        modified += [Path(x) for x, y in new.items()
+                     if x in old and old[x] != y]
+    added.sort()
+    removed.sort()
+    modified.sort()
+    return added, removed, modified
@@ -0,0 +1,106 @@
+"""Parallel versions of the 'filetools' tree walkers"""
+from typing import Callable, Dict, List, Optional, Tuple
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from pathlib import Path
+import queue
+
+from . import filetools
+
+# Seconds between checks of the 'cancel' callable while waiting a listing
+_CANCEL_POLL = 0.1
+
+
+def get_folders_tree(base_folder: Path, filter_scan: Tuple[str, ...] = (),
+                     workers=8, max_depth: Optional[int] = None,
+                     cancel: Optional[Callable[[], bool]] = None
+                     ) -> List[Path]:
+    """
+    --------------------------------------------------------------------------
+    Parallel version of 'filetools.get_folders_tree()' (same sorted output)
+    for filesystems where listing a folder is dominated by latency (NFS,
+    SMB...). The folders are listed by a pool of <workers> threads, every
+    listed folder queuing its subfolders.
+    - max_depth: [optional] only include folders up to this depth (1 for
+                 the folders in base_folder)
+    - cancel: [optional] callable checked while walking; if it returns True
+              the pending listings are dropped and CancelledError is raised
+    --------------------------------------------------------------------------
+    """
+    # pylint: disable=too-many-locals
+    assert base_folder.is_absolute(), "'base_folder' must be an absolute path."
+
+    if any(filetools.is_path_pattern(x) for x in filter_scan):
+        folders = filetools.get_folders_tree(base_folder, filter_scan)
+        if max_depth is not None:
+            depths = [_depth(x, base_folder) for x in folders]
+            folders = [x for x, y in zip(folders, depths) if y <= max_depth]
+        return folders
+
+    top_dirs = filetools.get_top_folders(base_folder, filter_scan)
+    if max_depth is not None and max_depth < 1:
+        return []
+
+    full_tree: List[str] = []
+    done: "queue.Queue[Future]" = queue.Queue()
+    pending: Dict[Future, Tuple[str, int]] = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+
+        def submit(folder: str, depth: int):
+            future = pool.submit(filetools.scan_subfolders, folder)
+            pending[future] = (folder, depth)
+            future.add_done_callback(done.put)
+
+        for folder in top_dirs:
+            submit(folder, 1)
+        while pending:
+            _check_cancel(cancel, pool)
+            try:
+                future = done.get(timeout=_CANCEL_POLL)
+            except queue.Empty:
+                continue
+            folder, depth = pending.pop(future)
+            subdirs = future.result()
+            if subdirs is None:
+                continue
+            full_tree.append(folder)
+            if max_depth is None or depth < max_depth:
+                for subdir in subdirs:
+                    submit(subdir, depth + 1)
+    folders = [Path(x) for x in full_tree]
+    folders.sort()
+    return folders
+
+
+def get_files_tree(folders_tree: List[Path], extensions: Tuple[str, ...] = (),
+                   upper_lower=True, workers=8,
+                   cancel: Optional[Callable[[], bool]] = None) -> List[Path]:
+    """
+    --------------------------------------------------------------------------
+    Parallel version of 'filetools.get_files_tree()' (same sorted output):
+    the folders are listed by a pool of <workers> threads.
+    - cancel: [optional] callable checked while walking; if it returns True
+              the pending listings are dropped and CancelledError is raised
+    --------------------------------------------------------------------------
+    """
+    full_files: List[Path] = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = [pool.submit(filetools.list_folder_files, x, extensions,
+                               upper_lower) for x in folders_tree]
+        for future in pending:
+            _check_cancel(cancel, pool)
+            full_files += future.result()
+    full_files.sort()
+    return full_files
+
+
+def _check_cancel(cancel: Optional[Callable[[], bool]],
+                  pool: ThreadPoolExecutor):
+    """Drop the pending work of the <pool> if <cancel> returns True"""
+    if cancel is not None and cancel():
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise CancelledError("Folders walk cancelled")
+
+
+def _depth(folder: Path, base_folder: Path) -> int:
+    """Return the depth of the <folder> in <base_folder> (1 for children)"""
+    return len(folder.relative_to(base_folder).parts)
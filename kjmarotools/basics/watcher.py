@@ -0,0 +1,290 @@
+"""Watch mode (Linux inotify) reporting the new files of a folder tree"""
+from typing import Callable, Dict, Iterator, List, Optional
+from pathlib import Path
+import ctypes.util
+import ctypes
+import select
+import struct
+import errno
+import time
+import os
+
+# inotify constants (see 'man 7 inotify')
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_FILE_EVENTS = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+_TREE_EVENTS = IN_DELETE | IN_DELETE_SELF
+_WATCH_MASK = _FILE_EVENTS | _TREE_EVENTS | IN_ONLYDIR | IN_DONT_FOLLOW
+# Errors of 'inotify_add_watch()' meaning the tree can not be fully watched
+_WATCH_LIMITS = {errno.ENOSPC, errno.ENOMEM}
+_EVENT = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+
+class FolderWatcher:
+    """
+    --------------------------------------------------------------------------
+    Recursive inotify watch of <base_folder> (Linux only) yielding debounced
+    batches of the new files (absolute paths) with 'batches()':
+    - A file is new when it is closed after writing or moved into the tree
+      (a file removed before the batch is emitted is dropped from it)
+    - New (or moved in) folders are watched automatically and their files
+      are reported as new. Folders moved out of the tree or deleted are no
+      longer watched and their pending files are dropped.
+    - Folders that can not be watched (e.g. permissions) are reported in
+      'unwatched' ({folder: error}). Reaching the inotify limits
+      (fs.inotify.max_user_watches) raises OSError instead, as the changes
+      of the rest of the tree would be lost.
+    - If the kernel queue overflows (events lost) the tree is rescanned and
+      the files changed since the last complete read are reported
+    --------------------------------------------------------------------------
+    - debounce: seconds without events before emitting a batch
+    - max_delay: max seconds a file waits for its batch during long bursts
+    --------------------------------------------------------------------------
+    """
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, base_folder: Path, debounce=1.0, max_delay=10.0):
+        assert base_folder.is_absolute(), "'base_folder' must be absolute."
+        self.base_folder = base_folder
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._libc = _load_libc()
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            _raise_errno("inotify_init1")
+        self.unwatched: Dict[Path, str] = {}
+        self._folders: Dict[int, str] = {}
+        self._pending: Dict[str, None] = {}
+        self._first_event = 0.0
+        self._last_event = 0.0
+        self._synced_ns = time.time_ns()
+        try:
+            self._watch_tree(os.fspath(base_folder))
+        except OSError:
+            self.close()
+            raise
+        if not self._folders:
+            self.close()
+            reason = self.unwatched.get(base_folder, "not found")
+            raise OSError(f"Can not watch {base_folder} ({reason})")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Stop watching (the pending files are discarded)"""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def batches(self, stop: Optional[Callable[[], bool]] = None
+                ) -> Iterator[List[Path]]:
+        """
+        ----------------------------------------------------------------------
+        Yield batches of new files (absolute paths in arrival order), ready
+        for 'conventions.classify_filename()' or
+        'proprietdin.rename_proprietary_din_file()'.
+        - stop: [optional] callable checked at least every <debounce>
+                seconds; the generator ends when it returns True
+        ----------------------------------------------------------------------
+        """
+        while stop is None or not stop():
+            batch = self.poll(self.debounce)
+            if batch:
+                yield batch
+
+    def poll(self, timeout: float) -> List[Path]:
+        """
+        ----------------------------------------------------------------------
+        Wait up to <timeout> seconds for events and return the batch of new
+        files if it is ready (empty list otherwise)
+        ----------------------------------------------------------------------
+        """
+        if self._pending:
+            now = time.monotonic()
+            timeout = min(timeout, max(0.0, min(
+                self._last_event + self.debounce - now,
+                self._first_event + self.max_delay - now)))
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if ready:
+            self._read_events()
+
+        now = time.monotonic()
+        quiet = now - self._last_event >= self.debounce
+        overdue = now - self._first_event >= self.max_delay
+        if self._pending and (quiet or overdue):
+            batch = [Path(x) for x in self._pending]
+            self._pending.clear()
+            return batch
+        return []
+
+    def _read_events(self):
+        """Read and process all the queued events"""
+        data = b""
+        while True:
+            try:
+                chunk = os.read(self._fd, _READ_SIZE)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            data += chunk
+
+        overflow = False
+        offset = 0
+        while offset < len(data):
+            wdesc, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+            elif mask & (IN_IGNORED | IN_DELETE_SELF):
+                if wdesc in self._folders:
+                    self._forget(self._folders[wdesc])
+            elif wdesc in self._folders:
+                self._process(self._folders[wdesc], name, mask)
+
+        if overflow:
+            self._rescan()
+        else:
+            self._synced_ns = time.time_ns()
+
+    def _process(self, folder: str, name: str, mask: int):
+        """Update the pending files with an event of <folder>/<name>"""
+        path = os.path.join(folder, name)
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                for file in self._watch_tree(path):
+                    self._add_pending(file)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                self._forget(path)
+        elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+            self._add_pending(path)
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            self._pending.pop(path, None)
+
+    def _add_pending(self, path: str):
+        """Add a new file to the current batch"""
+        now = time.monotonic()
+        if not self._pending:
+            self._first_event = now
+        self._last_event = now
+        self._pending.pop(path, None)
+        self._pending[path] = None
+
+    def _forget(self, folder: str):
+        """Stop watching the <folder> tree and drop its pending files"""
+        prefix = os.path.join(folder, "")
+        for wdesc, current in list(self._folders.items()):
+            if current == folder or current.startswith(prefix):
+                del self._folders[wdesc]
+                self._libc.inotify_rm_watch(self._fd, wdesc)
+        for path in [x for x in self._pending if x.startswith(prefix)]:
+            del self._pending[path]
+        for unwatched in [x for x in self.unwatched
+                          if x == Path(folder) or str(x).startswith(prefix)]:
+            del self.unwatched[unwatched]
+
+    def _add_watch(self, folder: str) -> bool:
+        """
+        ----------------------------------------------------------------------
+        Watch the <folder> returning if it is watched. Folders removed
+        meanwhile are ignored, other errors are added to 'unwatched' and the
+        inotify limits raise OSError.
+        ----------------------------------------------------------------------
+        """
+        wdesc = self._libc.inotify_add_watch(self._fd, os.fsencode(folder),
+                                             _WATCH_MASK)
+        if wdesc >= 0:
+            self._folders[wdesc] = folder
+            self.unwatched.pop(Path(folder), None)
+            return True
+        code = ctypes.get_errno()
+        if code in _WATCH_LIMITS:
+            raise OSError(code, f"Can not watch {folder}: "
+                          f"{os.strerror(code)} (see the inotify limits "
+                          "in 'man 7 inotify')")
+        if code not in (errno.ENOENT, errno.ENOTDIR):
+            self.unwatched[Path(folder)] = os.strerror(code)
+        return False
+
+    def _watch_tree(self, folder: str) -> List[str]:
+        """Watch <folder> and its subfolders returning the files found"""
+        files: List[str] = []
+        pending = [folder]
+        while pending:
+            current = pending.pop()
+            if not self._add_watch(current):
+                continue
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                            elif entry.is_file():
+                                files.append(entry.path)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return files
+
+    def _rescan(self):
+        """Watch the whole tree again after losing events (queue overflow)"""
+        for file in self._watch_tree(os.fspath(self.base_folder)):
+            try:
+                stat = os.stat(file)
+            except OSError:
+                continue
+            if max(stat.st_mtime_ns, stat.st_ctime_ns) >= self._synced_ns:
+                self._add_pending(file)
+        self._synced_ns = time.time_ns()
+
+
+def watch_folder(base_folder: Path, debounce=1.0, max_delay=10.0,
+                 stop: Optional[Callable[[], bool]] = None
+                 ) -> Iterator[List[Path]]:
+    """
+    --------------------------------------------------------------------------
+    Watch <base_folder> recursively yielding batches of new files (see
+    'FolderWatcher') until <stop> returns True
+    --------------------------------------------------------------------------
+    """
+    with FolderWatcher(base_folder, debounce, max_delay) as watcher:
+        yield from watcher.batches(stop)
+
+
+def _load_libc() -> ctypes.CDLL:
+    """Return the C library with the inotify functions"""
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6",
+                       use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        raise OSError("inotify is not available in this system")
+    libc.inotify_init1.argtypes = [ctypes.c_int]
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p,
+                                       ctypes.c_uint32]
+    libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    return libc
+
+
+def _raise_errno(function: str):
+    """Raise the OSError of the last failed libc call"""
+    code = ctypes.get_errno()
+    raise OSError(code, f"{function}: {os.strerror(code)}")
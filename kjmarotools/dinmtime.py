@@ -0,0 +1,168 @@
+"""Pipeline applying the date in the filename (DIN) to the file mtime"""
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from logging import Logger
+from pathlib import Path
+import functools
+import itertools
+import threading
+import datetime
+import os
+
+from .basics import conventions, filetools, ostools
+
+# mtimes closer than this to the date in the name are not changed: names
+# have second precision and FAT stores the mtime with 2 seconds precision
+_MTIME_TOLERANCE_NS = 2_000_000_000
+
+
+class DinMtimeReport(NamedTuple):
+    """
+    --------------------------------------------------------------------------
+    Result of 'apply_din_mtimes()' (number of files):
+    - changed: mtime set to the date in the name (or to set, if dry_run)
+    - unchanged: mtime already matching the date in the name (within the
+                 2 seconds precision of the FAT filesystems)
+    - unparseable: name without a date convention
+    - excluded: name in an excluded convention (TRKDIN by default)
+    - failed: {file: error} of the files that could not be updated
+    --------------------------------------------------------------------------
+    """
+    changed: int
+    unchanged: int
+    unparseable: int
+    excluded: int
+    failed: Dict[Path, str]
+
+
+def apply_din_mtimes(base_folder: Path, year_bounds=(1800, 2300),
+                     extensions: Tuple[str, ...] = (), upper_lower=True,
+                     proprietary=True, trkdin=False, workers=8,
+                     batch_size=1024, dry_run=False,
+                     logger: Optional[Logger] = None,
+                     log_header: str = "") -> DinMtimeReport:
+    """
+    --------------------------------------------------------------------------
+    Set the mtime of all the files in the <base_folder> tree to the date in
+    their names (KDIN, EKDIN and proprietary conventions, see
+    'conventions.classify_filename()'). Files whose mtime already matches
+    are not touched, so running it again only updates the new files.
+    - The files are listed folder by folder ('filetools.iter_files_tree()')
+      and the names are parsed in batches of <batch_size> (EKDIN and KDIN
+      names with the numpy batch parsers, if installed) while a pool of
+      <workers> threads does the stat + 'os.utime()' of the previous ones
+    - extensions/upper_lower: as in 'filetools.get_files_tree()'
+    - proprietary: if disabled, proprietary conventions are not applied
+    - trkdin: if enabled, TRKDIN files are applied too (excluded by default
+              as the trimmed name is usually not the capture date)
+    - dry_run: only count the files to change
+    - 'logger' to include a process log
+    - 'log_header' to add a header before the message log
+    --------------------------------------------------------------------------
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    # pylint: disable=too-many-locals
+    counts = {"changed": 0, "unchanged": 0, "unparseable": 0, "excluded": 0}
+    failed: Dict[Path, str] = {}
+    lock = threading.Lock()
+    in_flight = threading.BoundedSemaphore(workers * 64)
+
+    def update(file: Path, mtime_ns: int):
+        try:
+            stat = os.stat(file)
+            if abs(stat.st_mtime_ns - mtime_ns) < _MTIME_TOLERANCE_NS:
+                status = "unchanged"
+            else:
+                if not dry_run:
+                    ostools.set_file_times(file, stat.st_atime_ns, mtime_ns)
+                status = "changed"
+        except OSError as error:
+            with lock:
+                failed[file] = str(error)
+            return
+        with lock:
+            counts[status] += 1
+        if status == "changed" and logger is not None:
+            hdr = log_header if log_header else (
+                "Date to apply:" if dry_run else "File date applied:")
+            logger.info(hdr + " %s", file.name)
+
+    def done(file: Path, future: Future):
+        in_flight.release()
+        error = future.exception()
+        if error is not None:
+            with lock:
+                failed[file] = f"{type(error).__name__}: {error}"
+
+    folders = [base_folder, *filetools.get_folders_tree(base_folder)]
+    files = filetools.iter_files_tree(folders, extensions, upper_lower)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while batch := list(itertools.islice(files, batch_size)):
+            for file, status, mtime_ns in _parse_batch(
+                    batch, year_bounds, proprietary, trkdin):
+                if status:
+                    with lock:
+                        counts[status] += 1
+                    continue
+                in_flight.acquire()  # pylint: disable=consider-using-with
+                future = pool.submit(update, file, mtime_ns)
+                future.add_done_callback(functools.partial(done, file))
+    return DinMtimeReport(counts["changed"], counts["unchanged"],
+                          counts["unparseable"], counts["excluded"], failed)
+
+
+def _parse_batch(batch: List[Path], year_bounds, proprietary: bool,
+                 trkdin: bool) -> List[Tuple[Path, str, int]]:
+    """
+    --------------------------------------------------------------------------
+    Return (file, status, mtime_ns) for a batch of files: status is
+    'unparseable' or 'excluded' for the files to skip, or empty for the
+    files to update to <mtime_ns>
+    --------------------------------------------------------------------------
+    """
+    parsed = []
+    for file, (kind, date) in zip(batch, _classify_batch(batch, year_bounds,
+                                                         proprietary)):
+        if not kind:
+            parsed.append((file, "unparseable", 0))
+        elif kind == "TRKDIN" and not trkdin:
+            parsed.append((file, "excluded", 0))
+        else:
+            parsed.append((file, "", ostools.datetime2ns(date)))
+    return parsed
+
+
+def _classify_batch(batch: List[Path], year_bounds, proprietary: bool
+                    ) -> List[Tuple[str, datetime.datetime]]:
+    """
+    --------------------------------------------------------------------------
+    Return the (kind, date) of 'conventions.classify_filename()' for every
+    file of the batch. EKDIN and KDIN names are parsed in bulk with the
+    numpy batch parsers; only the rest of the names (all of them if numpy
+    is not installed) are classified one by one.
+    --------------------------------------------------------------------------
+    """
+    try:
+        ekdin_dates, ekdin = conventions.get_files_ekdin_batch(batch,
+                                                               year_bounds)
+        kdin_dates, kdin = conventions.get_files_kdin_batch(batch,
+                                                            year_bounds)
+    except ImportError:
+        return [conventions.classify_filename(x, year_bounds, proprietary)[:2]
+                for x in batch]
+
+    nodate = datetime.datetime(1, 1, 1)
+    classified: List[Tuple[str, datetime.datetime]] = []
+    for idx, file in enumerate(batch):
+        if ekdin[idx]:
+            classified.append(("EKDIN", ekdin_dates[idx].item()))
+        elif kdin[idx]:
+            is_trkdin = conventions.is_file_trkdin(file, year_bounds)
+            classified.append(("TRKDIN" if is_trkdin else "KDIN",
+                               kdin_dates[idx].item()))
+        elif proprietary:
+            match = conventions.classify_filename(file, year_bounds)
+            classified.append((match.kind, match.date))
+        else:
+            classified.append(("", nodate))
+    return classified
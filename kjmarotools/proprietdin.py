@@ -1,10 +1,16 @@
 """ Here are allocated all the Proprietary name conventions"""
+from typing import Dict, Iterable, List, Match, NamedTuple, Optional
+from typing import Pattern, Sequence, Tuple
+from logging import Logger
 from abc import ABC, abstractmethod
 from pathlib import Path
+import functools
 import datetime
+import inspect
 import os
+import re
 
-from .basics import conventions
+from .basics import conventions, filetools
 
 
 def is_proprietary_din(file: Path, year_bounds=(1800, 2300)) -> bool:
@@ -14,10 +20,19 @@ def is_proprietary_din(file: Path, year_bounds=(1800, 2300)) -> bool:
     conventions
     --------------------------------------------------------------------------
     """
-    for prop_class in BaseProprietary.__subclasses__():
-        if prop_class().is_din(file, year_bounds):  # type: ignore
-            return True
-    return False
+    return match_proprietary_din(file, year_bounds)[0] is not None
+
+
+def match_proprietary_din(file: Path, year_bounds=(1800, 2300)
+                          ) -> Tuple[Optional["BaseProprietary"],
+                                     datetime.datetime]:
+    """
+    --------------------------------------------------------------------------
+    Return the (initialized) proprietary convention matching the filename and
+    its DIN. If none matches it returns (None, datetime(1, 1, 1))
+    --------------------------------------------------------------------------
+    """
+    return _DISPATCHER.engine.match(file, year_bounds)
 
 
 def kdin_from_proprietary_din(file: Path, year_bounds=(1800, 2300)) -> Path:
@@ -27,25 +42,26 @@ def kdin_from_proprietary_din(file: Path, year_bounds=(1800, 2300)) -> Path:
     --------------------------------------------------------------------------
     """
     # pylint: disable=protected-access
-    for prop_class in BaseProprietary.__subclasses__():
-        init_class = prop_class()  # type: ignore
-        if init_class.is_din(file, year_bounds):
-            dtt_date = init_class.get_din(file, year_bounds)
-            str_date = dtt_date.strftime(init_class._din_fmt)
-            new_name = "".join(file.name.split(str_date))
-            tail0, tail1 = "", ""
-            if init_class._tail:
-                tail0 = " " + init_class._tail
-                tail1 = tail0 + " "
-            if not new_name:
-                new_name = conventions.date2kdin(dtt_date) + tail0
-            elif new_name == file.suffix or new_name[0] == " ":
-                new_name = conventions.date2kdin(dtt_date) + tail0 + new_name
-            else:
-                new_name = conventions.date2kdin(dtt_date) + tail1 + new_name
-            new_path = file.parent.joinpath(new_name)
-            return new_path
-    return file
+    init_class, dtt_date = match_proprietary_din(file, year_bounds)
+    if init_class is None:
+        return file
+    if isinstance(init_class, PatternProprietary):
+        found = init_class._match(file)
+        new_name = file.name[found.end():] if found is not None else ""
+    else:
+        str_date = dtt_date.strftime(init_class._din_fmt)
+        new_name = "".join(file.name.split(str_date))
+    tail0, tail1 = "", ""
+    if init_class._tail:
+        tail0 = " " + init_class._tail
+        tail1 = tail0 + " "
+    if not new_name:
+        new_name = conventions.date2kdin(dtt_date) + tail0
+    elif new_name == file.suffix or new_name[0] == " ":
+        new_name = conventions.date2kdin(dtt_date) + tail0 + new_name
+    else:
+        new_name = conventions.date2kdin(dtt_date) + tail1 + new_name
+    return file.parent.joinpath(new_name)
 
 
 def rename_proprietary_din_file(file: Path, year_bounds=(1800, 2300)) -> Path:
@@ -64,6 +80,357 @@ def rename_proprietary_din_file(file: Path, year_bounds=(1800, 2300)) -> Path:
     return new_path
 
 
+def plan_proprietary_din_renames(files: Iterable[Path],
+                                 year_bounds=(1800, 2300),
+                                 journal: Optional[Path] = None
+                                 ) -> Tuple[filetools.RenamePlan,
+                                            List[filetools.RenameOutcome]]:
+    """
+    --------------------------------------------------------------------------
+    Plan the KDIN rename of the proprietary files (as in
+    'rename_proprietary_din_file()') listing every destination folder only
+    once. Return the plan and the outcomes of the files left out of it:
+    - 'unchanged': the file is not in a proprietary DIN convention
+    - 'exists':    the KDIN name exists or is the target of a previous file
+                   of the batch (the file is not renamed)
+    Renames already done in the <journal> of a previous run are kept in the
+    plan so 'RenamePlan.run()' reports them as 'journaled'.
+    --------------------------------------------------------------------------
+    """
+    done = filetools.read_journal(journal)[0] if journal is not None else {}
+    allocators: Dict[Path, filetools.NameAllocator] = {}
+    operations: List[filetools.RenameOperation] = []
+    skipped: List[filetools.RenameOutcome] = []
+    for file in dict.fromkeys(files):
+        new_path = kdin_from_proprietary_din(file, year_bounds)
+        if new_path == file:
+            skipped.append(filetools.RenameOutcome(file, file, "unchanged"))
+            continue
+        if new_path.parent not in allocators:
+            allocators[new_path.parent] = filetools.NameAllocator(
+                new_path.parent)
+        reserved = allocators[new_path.parent].reserve(new_path.name)
+        if not reserved and (str(file), str(new_path)) not in done:
+            skipped.append(filetools.RenameOutcome(file, new_path, "exists"))
+            continue
+        operations.append(filetools.RenameOperation(file, new_path))
+    return filetools.RenamePlan(operations), skipped
+
+
+def rename_proprietary_din_files(files: Iterable[Path],
+                                 year_bounds=(1800, 2300), dry_run=False,
+                                 workers=8, journal: Optional[Path] = None,
+                                 logger: Optional[Logger] = None,
+                                 log_header: str = ""
+                                 ) -> List[filetools.RenameOutcome]:
+    """
+    --------------------------------------------------------------------------
+    Batch version of 'rename_proprietary_din_file()'. All the renames are
+    planned first (see 'plan_proprietary_din_renames()') and executed on a
+    pool of <workers> threads without overwriting any file. Return the
+    outcome of every file in input order (see 'filetools.RenameOutcome').
+    - 'dry_run' to only return (and log) the plan without touching disk
+    - 'journal' append-only file to resume an interrupted run or undo it
+      with 'filetools.rollback_journal()'
+    - 'logger' to include a process log
+    - 'log_header' to add a header before the message log
+    --------------------------------------------------------------------------
+    """
+    # pylint: disable=too-many-arguments, too-many-positional-arguments
+    files = list(files)
+    plan, skipped = plan_proprietary_din_renames(files, year_bounds, journal)
+    outcomes = plan.run(dry_run, workers, journal, logger, log_header)
+    by_source = {x.source: x for x in skipped + outcomes}
+    return [by_source[x] for x in files]
+
+
+class ProprietaryEngine:
+    """
+    --------------------------------------------------------------------------
+    Matching engine for a list of proprietary conventions (priority is their
+    order in the list). The conventions are bucketed by the static prefix of
+    their '_din_fmt' and the ones whose format can be translated into a regex
+    are combined in one compiled pattern per bucket, with a named group per
+    convention. Each filename is scanned only once and the group found tells
+    which convention matched. The cost of a match grows with the number of
+    conventions sharing its prefix (alternatives tried by the pattern), not
+    with the total number of conventions.
+    --------------------------------------------------------------------------
+    - 'PatternProprietary' conventions get the date directly from the groups
+      of their exact fixed-width regex (see '_din_fmt_fixed_regex()')
+    - Other conventions (adapter) use the 'strptime' regex (see
+      '_din_fmt_regex()') only as a filter and confirm the match with their
+      own 'get_din()'
+    - Conventions without regex (unsupported directives or with a custom
+      '_dispatch_prefix') are checked with their prefix and minimum length
+    --------------------------------------------------------------------------
+    """
+    # pylint: disable=too-few-public-methods
+    def __init__(self, din_conventions: Sequence["BaseProprietary"]):
+        # pylint: disable=protected-access
+        self.conventions = list(din_conventions)
+        self._regexes: Dict[int, str] = {}
+        self._groups: Dict[int, List[Tuple[int, str]]] = {}
+        self._min_len: Dict[int, int] = {}
+        self._table: Dict[str, List[int]] = {}
+        for order, convention in enumerate(self.conventions):
+            prefix, self._min_len[order] = convention._dispatch_keys()
+            self._table.setdefault(prefix, []).append(order)
+            if convention._dispatch_prefix is None:
+                regex = _convention_regex(convention, f"c{order}")
+                if regex is not None:
+                    self._regexes[order] = regex
+                    self._groups[order] = [
+                        (slot, f"c{order}_{x}")
+                        for x, (slot, *_) in _FIXED_FIELDS.items()
+                        if f"<c{order}_{x}>" in regex]
+        self._lengths = sorted({len(x) for x in self._table})
+        self._patterns: Dict[Tuple[int, ...], Optional[Pattern]] = {}
+
+    def _candidates(self, filename: str) -> Tuple[int, ...]:
+        """Conventions whose prefix and minimum length fit the filename"""
+        found: List[int] = []
+        lower_name = filename[:self._lengths[-1]].lower()
+        for length in self._lengths:
+            bucket = self._table.get(lower_name[:length])
+            if bucket:
+                found = sorted(found + bucket) if found else bucket
+        size = len(filename)
+        return tuple(x for x in found if self._min_len[x] <= size)
+
+    def _pattern(self, orders: Tuple[int, ...]) -> Optional[Pattern]:
+        """Combined pattern of the conventions <orders> (compiled once)"""
+        if orders not in self._patterns:
+            regexes = [f"(?P<c{x}>{self._regexes[x]})" for x in orders
+                       if x in self._regexes]
+            self._patterns[orders] = re.compile(
+                "|".join(regexes)) if regexes else None
+        return self._patterns[orders]
+
+    def match(self, file: Path, year_bounds=(1800, 2300)
+              ) -> Tuple[Optional["BaseProprietary"], datetime.datetime]:
+        """
+        ----------------------------------------------------------------------
+        Return the first convention matching the file and its DIN or
+        (None, datetime(1, 1, 1)) if none matches
+        ----------------------------------------------------------------------
+        """
+        filename = file.name
+        orders = self._candidates(filename) if self._lengths else ()
+        while orders:
+            pattern = self._pattern(orders)
+            found = pattern.match(filename) if pattern is not None else None
+            lastgroup = found.lastgroup if found is not None else None
+            order = int(lastgroup[1:]) if lastgroup else orders[-1] + 1
+            for other in orders:
+                if other >= order:
+                    break
+                if other not in self._regexes:
+                    dtt_date = self.conventions[other].get_din(file,
+                                                               year_bounds)
+                    if dtt_date.year != 1:
+                        return self.conventions[other], dtt_date
+            if found is None or lastgroup is None:
+                break
+            dtt_date = self._regex_din(order, found, file, year_bounds)
+            if dtt_date.year != 1:
+                return self.conventions[order], dtt_date
+            orders = tuple(x for x in orders if x > order)
+        return None, datetime.datetime(1, 1, 1)
+
+    def _regex_din(self, order: int, found: Match, file: Path,
+                   year_bounds=(1800, 2300)) -> datetime.datetime:
+        """DIN of a convention whose regex matched the filename"""
+        convention = self.conventions[order]
+        if not isinstance(convention, PatternProprietary):
+            return convention.get_din(file, year_bounds)
+        args = [1900, 1, 1, 0, 0, 0]
+        for slot, group in self._groups[order]:
+            args[slot] = int(found.group(group))
+        try:
+            new_date = _fields2datetime(args)
+        except ValueError:
+            return datetime.datetime(1, 1, 1)
+        if year_bounds[0] <= new_date.year <= year_bounds[1]:
+            return new_date
+        return datetime.datetime(1, 1, 1)
+
+
+class _Dispatcher:
+    """
+    --------------------------------------------------------------------------
+    Registry of the proprietary conventions (every concrete subclass of
+    'BaseProprietary' is registered when it is defined). The conventions are
+    initialized once and compiled into a 'ProprietaryEngine' keeping the
+    definition order as priority.
+    --------------------------------------------------------------------------
+    """
+    def __init__(self):
+        self._classes: List[type] = []
+        self._engine: Optional[ProprietaryEngine] = None
+
+    def register(self, prop_class: type):
+        """Register a new convention class (engine is compiled on next use)"""
+        self._classes.append(prop_class)
+        self._engine = None
+
+    @property
+    def engine(self) -> ProprietaryEngine:
+        """Engine with every registered (and not abstract) convention"""
+        if self._engine is None:
+            self._engine = ProprietaryEngine(
+                [x() for x in self._classes if not inspect.isabstract(x)])
+        return self._engine
+
+
+_DISPATCHER = _Dispatcher()
+_DIRECTIVE_MIN_LEN = {"Y": 4, "y": 2, "m": 1, "d": 1, "H": 1, "I": 1, "M": 1,
+                      "S": 1, "j": 1, "f": 1, "w": 1}
+_FIXED_FIELDS = {"Y": (0, 4, 0, 9999), "m": (1, 2, 1, 12), "d": (2, 2, 1, 31),
+                 "H": (3, 2, 0, 23), "M": (4, 2, 0, 59), "S": (5, 2, 0, 59)}
+
+
+_STRPTIME_RE = {"Y": r"(?P<Y>\d\d\d\d)", "m": r"(?P<m>1[0-2]|0[1-9]|[1-9])",
+                "d": r"(?P<d>3[0-1]|[1-2]\d|0[1-9]|[1-9]| [1-9])",
+                "H": r"(?P<H>2[0-3]|[0-1]\d|\d)", "M": r"(?P<M>[0-5]\d|\d)",
+                "S": r"(?P<S>6[0-1]|[0-5]\d|\d)"}
+
+
+class _DinFmtPlan(NamedTuple):
+    """Fixed-offset parsing plan of a '_din_fmt' (see '_compile_din_fmt()')"""
+    width: int
+    literals: Tuple[Tuple[int, int, str], ...]
+    fields: Tuple[Tuple[int, int, int, int, int], ...]
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_din_fmt(din_fmt: str) -> Optional[_DinFmtPlan]:
+    """
+    --------------------------------------------------------------------------
+    Compile a fixed-width 'strptime' format into the literal checks and the
+    integer slice offsets of its fields. Returns None if the format includes
+    any directive not in '_FIXED_FIELDS' (or a repeated one).
+    - literals: (start, stop, text)
+    - fields: (datetime argument index, start, stop, min value, max value)
+    --------------------------------------------------------------------------
+    """
+    literals: List[Tuple[int, int, str]] = []
+    fields: List[Tuple[int, int, int, int, int]] = []
+    pos, idx = 0, 0
+    while idx < len(din_fmt):
+        char = din_fmt[idx]
+        if char == "%":
+            directive = din_fmt[idx + 1:idx + 2]
+            if directive in _FIXED_FIELDS:
+                slot, width, low, high = _FIXED_FIELDS[directive]
+                if slot in [x[0] for x in fields]:
+                    return None
+                fields.append((slot, pos, pos + width, low, high))
+                pos, idx = pos + width, idx + 2
+                continue
+            if directive != "%":
+                return None
+            idx += 1
+        if literals and literals[-1][1] == pos:
+            literals[-1] = (literals[-1][0], pos + 1, literals[-1][2] + char)
+        else:
+            literals.append((pos, pos + 1, char))
+        pos, idx = pos + 1, idx + 1
+    return _DinFmtPlan(pos, tuple(literals), tuple(fields))
+
+
+def parse_din_fmt(date_name: str, din_fmt: str) -> datetime.datetime:
+    """
+    --------------------------------------------------------------------------
+    Same as 'datetime.strptime(date_name, din_fmt)' but fixed-width formats
+    are parsed by slicing the precompiled offsets of '_compile_din_fmt()'.
+    Any text not strictly following the plan (other widths, non-ASCII digits,
+    different case or whitespace, out of range fields...) is left to
+    'strptime' so results (and ValueError rejections) are always the same.
+    --------------------------------------------------------------------------
+    """
+    plan = _compile_din_fmt(din_fmt)
+    if plan is not None and len(date_name) == plan.width:
+        for start, stop, text in plan.literals:
+            if date_name[start:stop] != text:
+                return datetime.datetime.strptime(date_name, din_fmt)
+        args = [1900, 1, 1, 0, 0, 0]
+        for slot, start, stop, low, high in plan.fields:
+            field = date_name[start:stop]
+            if not (field.isascii() and field.isdigit()):
+                return datetime.datetime.strptime(date_name, din_fmt)
+            args[slot] = int(field)
+            if not low <= args[slot] <= high:
+                return datetime.datetime.strptime(date_name, din_fmt)
+        return _fields2datetime(args)
+    return datetime.datetime.strptime(date_name, din_fmt)
+
+
+def _fields2datetime(args: List[int]) -> datetime.datetime:
+    """Return the datetime of the [Y, m, d, H, M, S] fields"""
+    year, month, day, hour, minute, second = args
+    return datetime.datetime(year, month, day, hour, minute, second)
+
+
+@functools.lru_cache(maxsize=None)
+def _din_fmt_regex(din_fmt: str, group: str) -> Optional[str]:
+    """
+    --------------------------------------------------------------------------
+    Translate the format into the same regex used by 'strptime' (for the
+    directives in '_FIXED_FIELDS') with the fields as named groups
+    '{group}_{directive}'. Returns None for not supported formats.
+    --------------------------------------------------------------------------
+    """
+    if _compile_din_fmt(din_fmt) is None:
+        return None
+    regex = ""
+    for idx, text in enumerate(re.split("(%.)", din_fmt)):
+        if idx % 2 and text != "%%":
+            regex += _STRPTIME_RE[text[1]].replace("(?P<", f"(?P<{group}_")
+        else:
+            text = text.replace("%%", "%")
+            texts = re.split(r"\s+", text)
+            regex += "\\s+".join(re.escape(x) for x in texts)
+    return regex
+
+
+@functools.lru_cache(maxsize=None)
+def _din_fmt_fixed_regex(din_fmt: str, group: str) -> Optional[str]:
+    """
+    --------------------------------------------------------------------------
+    Translate the plan of '_compile_din_fmt()' into an exact regex: the
+    static text with its case and every field with its fixed number of ASCII
+    digits, as named groups '{group}_{directive}'. Returns None for not
+    supported formats.
+    --------------------------------------------------------------------------
+    """
+    plan = _compile_din_fmt(din_fmt)
+    if plan is None:
+        return None
+    directives = {slot: x for x, (slot, *_) in _FIXED_FIELDS.items()}
+    parts = [(start, re.escape(text)) for start, _, text in plan.literals]
+    parts += [(start, f"(?P<{group}_{directives[slot]}>[0-9]"
+                      f"{{{stop - start}}})")
+              for slot, start, stop, *_ in plan.fields]
+    return "".join(x for _, x in sorted(parts))
+
+
+def _convention_regex(convention: "BaseProprietary", group: str
+                      ) -> Optional[str]:
+    """
+    --------------------------------------------------------------------------
+    Regex of the convention for 'ProprietaryEngine': the exact one for
+    'PatternProprietary' and the case-insensitive 'strptime' one (a filter
+    confirmed by 'get_din()') for the rest
+    --------------------------------------------------------------------------
+    """
+    # pylint: disable=protected-access
+    if isinstance(convention, PatternProprietary):
+        return _din_fmt_fixed_regex(convention._din_fmt, group)
+    regex = _din_fmt_regex(convention._din_fmt, group)
+    return f"(?i:{regex})" if regex is not None else None
+
+
 class BaseProprietary(ABC):
     """
     --------------------------------------------------------------------------
@@ -77,8 +444,39 @@ class BaseProprietary(ABC):
     - _clean_datename(): Return the datename clean (only static values)
     --------------------------------------------------------------------------
     - NOTE: Only the abstract methods must be overwritten
+    - NOTE: Conventions fully defined by a '_din_fmt' placed at the beginning
+            of the filename can just subclass 'PatternProprietary'
+    --------------------------------------------------------------------------
+    - Dispatching assumes that the date-in-name is at the beginning of the
+      filename (the static text before the first '%' of '_din_fmt' is used
+      as prefix). Set '_dispatch_prefix' to override it ("" to disable it).
     --------------------------------------------------------------------------
     """
+    _dispatch_prefix: Optional[str] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _DISPATCHER.register(cls)
+
+    def _dispatch_keys(self) -> Tuple[str, int]:
+        """
+        ----------------------------------------------------------------------
+        Return the filename prefix required by the convention and the minimum
+        length of the filename, both obtained from '_din_fmt' (minimum chars
+        taken by each 'strptime' directive in '_DIRECTIVE_MIN_LEN')
+        ----------------------------------------------------------------------
+        """
+        if self._dispatch_prefix is not None:
+            return self._dispatch_prefix.lower(), len(self._dispatch_prefix)
+        # 'strptime' ignores the case and matches any whitespace run
+        fields = self._din_fmt.replace("%%", "\0").split("%")
+        prefix = re.split(r"\s", fields[0].replace("\0", "%"))[0].lower()
+        min_len = len(re.sub(r"\s+", " ", fields[0]))
+        for field in fields[1:]:
+            directive, static = field[:1], re.sub(r"\s+", " ", field[1:])
+            min_len += _DIRECTIVE_MIN_LEN.get(directive, 0) + len(static)
+        return prefix, min_len
+
     @property
     @abstractmethod
     def _tail(self) -> str:
@@ -137,13 +535,17 @@ class BaseProprietary(ABC):
             if not self._conditions_ok(file):
                 raise ValueError
             clean_name = self._clean_datename(file)
-            new_date = datetime.datetime.strptime(clean_name, self._din_fmt)
+            new_date = parse_din_fmt(clean_name, self._din_fmt)
             if year_bounds[0] <= new_date.year <= year_bounds[1]:
                 return new_date
             raise ValueError
         except ValueError:
             return datetime.datetime(1, 1, 1)
 
+    def get_datename(self, file: Path) -> str:
+        """Return the date-name of the file in the convention (its DIN text)"""
+        return self._clean_datename(file)
+
     def is_din(self, file: Path, year_bounds=(1800, 2300)) -> bool:
         """
         ----------------------------------------------------------------------
@@ -153,6 +555,33 @@ class BaseProprietary(ABC):
         return self.get_din(file, year_bounds).year != 1
 
 
+class PatternProprietary(BaseProprietary):
+    """
+    --------------------------------------------------------------------------
+    Base Class for the proprietary conventions fully defined by their
+    '_din_fmt' placed at the beginning of the filename (only '_tail' and
+    '_din_fmt' must be overwritten). Its conditions and datename are given by
+    the exact regex of the format (fixed-width fields and the same case as
+    the static text), so 'ProprietaryEngine' gets their date directly from
+    the combined pattern.
+    --------------------------------------------------------------------------
+    """
+    # pylint: disable=abstract-method, arguments-differ
+    def _match(self, file: Path) -> Optional[Match]:
+        """Match the '_din_fmt' regex at the beginning of the filename"""
+        regex = _din_fmt_fixed_regex(self._din_fmt, "din")
+        if regex is None:
+            raise ValueError(f"Not supported '_din_fmt': {self._din_fmt}")
+        return re.match(regex, file.name)
+
+    def _conditions_ok(self, file: Path) -> bool:  # type: ignore
+        return self._match(file) is not None
+
+    def _clean_datename(self, file: Path) -> str:  # type: ignore
+        found = self._match(file)
+        return found.group(0) if found is not None else ""
+
+
 class GooglePhotos(BaseProprietary):
     """GooglePhotos Proprietary Convention"""
     @property
@@ -225,6 +654,94 @@ class Whatsapp(BaseProprietary):
         return file.name[:37]
 
 
+class AndroidVideo(PatternProprietary):
+    """Android Video Proprietary Convention"""
+    @property
+    def _tail(self) -> str:
+        return super()._tail
+
+    @property
+    def _din_fmt(self) -> str:
+        return r"VID_%Y%m%d_%H%M%S"
+
+
+class Pixel(PatternProprietary):
+    """Google Pixel Proprietary Convention"""
+    @property
+    def _tail(self) -> str:
+        return super()._tail
+
+    @property
+    def _din_fmt(self) -> str:
+        return r"PXL_%Y%m%d_%H%M%S"
+
+
+class AndroidScreenshot(PatternProprietary):
+    """Android Screenshot Proprietary Convention"""
+    @property
+    def _tail(self) -> str:
+        return super()._tail
+
+    @property
+    def _din_fmt(self) -> str:
+        return r"Screenshot_%Y%m%d-%H%M%S"
+
+
+class WhatsappVideo(PatternProprietary):
+    """Whatsapp Video Proprietary Convention"""
+    @property
+    def _tail(self) -> str:
+        return super()._tail
+
+    @property
+    def _din_fmt(self) -> str:
+        return r"WhatsApp Video %Y-%m-%d at %H.%M.%S"
+
+
+class Signal(PatternProprietary):
+    """Signal Proprietary Convention"""
+    @property
+    def _tail(self) -> str:
+        return super()._tail
+
+    @property
+    def _din_fmt(self) -> str:
+        return r"signal-%Y-%m-%d-%H%M%S"
+
+
+class TelegramPhoto(PatternProprietary):
+    """Telegram Photo Proprietary Convention"""
+    @property
+    def _tail(self) -> str:
+        return super()._tail
+
+    @property
+    def _din_fmt(self) -> str:
+        return r"photo_%Y-%m-%d_%H-%M-%S"
+
+
+class TelegramVideo(PatternProprietary):
+    """Telegram Video Proprietary Convention"""
+    @property
+    def _tail(self) -> str:
+        return super()._tail
+
+    @property
+    def _din_fmt(self) -> str:
+        return r"video_%Y-%m-%d_%H-%M-%S"
+
+
+class Dji(PatternProprietary):
+    """DJI Proprietary Convention"""
+    @property
+    def _tail(self) -> str:
+        return super()._tail
+
+    @property
+    def _din_fmt(self) -> str:
+        return r"DJI_%Y%m%d%H%M%S"
+
+
 if __name__ == "__main__":
     # ========================================================================
     # For executing these examples remove the '.' in the '.infodtb' import
@@ -1,6 +1,23 @@
 """test"""
+from typing import List
+from unittest import mock
+from concurrent.futures import CancelledError
 from pathlib import Path
-from kjmarotools.basics import conventions
+import datetime
+import tempfile
+import hashlib
+import threading
+import asyncio
+import ctypes
+import errno
+import time
+import gc
+import sys
+import os
+from kjmarotools.basics import conventions, dinindex, filetools, walker
+from kjmarotools.basics import duplicates, hashcache, ostools
+from kjmarotools.basics import snapshot, watcher
+from kjmarotools import aio, dinmtime, proprietdin
 
 
 def folder_naming_test():
@@ -40,6 +57,15 @@ def folder_naming_test():
     print(conventions.is_folder_kdin(case10), tst10)
 
 
+def folder_naming_batch_test():
+    """folder_naming_batch_test"""
+    names = ["2021", "2021-10 trip", Path("2021-10-15_2022-01-12"),
+             "2021-10 trip", "no-date"]
+    for name, bounds in zip(names, conventions.get_folders_kdin_bounds_batch(
+            names)):
+        print(name, bounds)
+
+
 def file_date_in_name_test():
     """file_date_in_name_test"""
     nam1 = Path.cwd().joinpath("20210203-151603")
@@ -73,7 +99,629 @@ def file_date_in_name_edition_test():
     print(conventions.is_file_ekdin(nam4), tst4)
 
 
+def file_date_in_name_batch_test():
+    """file_date_in_name_batch_test (requires numpy)"""
+    names = ["20210203-151603", "20210203-151603 cas.jpg", "20210230-151603",
+             "asd++2021-02-03+15-16-03++csc.jof", "++2021-02-03+15-16-03++"]
+
+    dates, valid = conventions.get_files_kdin_batch(names)
+    print(list(zip(names, dates, valid)))
+
+    dates, valid = conventions.get_files_ekdin_batch(names)
+    print(list(zip(names, dates, valid)))
+
+    print(conventions.get_files_kdin_batch([]),
+          conventions.get_files_ekdin_batch([]))
+
+
+def classify_filename_test():
+    """classify_filename_test"""
+    names = ["20210203-151603 cas.jpg", "20210203-151603(DTR) cas.jpg",
+             "asd++2021-02-03+15-16-03++csc.jof", "IMG_20210105_010203.jpg",
+             "WhatsApp Image 2018-09-22 at 18.11.39.jpg", "nodate.jpg"]
+    for name in names:
+        print(conventions.classify_filename(Path.cwd().joinpath(name)))
+
+
+def parser_cache_test():
+    """parser_cache_test"""
+    conventions.set_parser_cache()
+    conventions.parser_cache_clear()
+    for parent in ("A", "B", "C"):
+        print(conventions.is_folder_kdin(Path(parent, "2021-10 trip")))
+    print(conventions.parser_cache_info())
+    conventions.set_parser_cache(0)
+
+
+def folder_date_index_test():
+    """folder_date_index_test"""
+    folders = [Path("2021"), Path("2021", "2021-10 trip"), Path("misc"),
+               Path("2021", "2021-10-11_15 party"), Path("2021-09_2021-11")]
+    index = dinindex.FolderDateIndex(folders)
+    print(index.query(datetime.datetime(2021, 10, 12, 20, 15)))
+    print(index.best(datetime.datetime(2021, 10, 20)))
+    print(index.overlaps(nested=False))
+
+
+def folder_date_index_scale_test():
+    """folder_date_index_scale_test (overlapping ranges, requires numpy)"""
+    folders = [Path(f"{2000 + x % 30}-{x % 12 + 1:02d}_"
+                    f"{2030 + x * 7 % 30}-{x * 5 % 12 + 1:02d} f{x}")
+               for x in range(3000)]
+    index = dinindex.FolderDateIndex(folders)
+    names = [f"{2000 + x}{x % 12 + 1:02d}15-120000.jpg" for x in range(0, 70)]
+    dates, _ = conventions.get_files_kdin_batch(names)
+    found = index.query_many(dates)
+    for date, covers in zip(dates.tolist(), found):
+        linear = [x for x, (date0, date1) in zip(index.folders, index.bounds)
+                  if date0 <= date < date1]
+        assert sorted(covers) == sorted(linear), date
+    print(len(index), [len(x) for x in found[::10]],
+          found == index.query_many(dates.tolist()))
+
+
+def ekdin2kdin_renames_test():
+    """ekdin2kdin_renames_test (collisions solved in memory, no overwrite)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        names = ["a++2021-02-03+15-16-03++.jpg", "++2021-02-03+15-16-03++.jpg",
+                 "20210203-151603.jpg", "nodate.jpg"]
+        for name in names:
+            Path(tmp, name).write_text(name, encoding="utf-8")
+        plan = filetools.plan_ekdin2kdin_renames(
+            sorted(Path(tmp).iterdir()))
+        print([(x.source.name, x.target.name) for x in plan])
+        print(len(plan.execute()), sorted(x.name for x in Path(tmp).iterdir()))
+
+        try:
+            filetools.rename_noreplace(Path(tmp, "nodate.jpg"),
+                                       Path(tmp, "20210203-151603.jpg"))
+        except FileExistsError:
+            print("kept:", Path(tmp, "20210203-151603.jpg").read_text(
+                encoding="utf-8"))
+
+
+def proprietary_kdin_test():
+    """proprietary_kdin_test (exact fields and case of the pattern ones)"""
+    names = ["VID_20210105_010203.mp4", "VID_20210105_010203 x.mp4",
+             "VID_20210105_1234.mp4", "vid_20210105_010203.mp4",
+             "VID_2021115_010203.mp4", "VID_20210105_01020.mp4",
+             "IMG_20210105_010203.jpg"]
+    for name in names:
+        print(name, "->", proprietdin.kdin_from_proprietary_din(
+            Path(name)).name)
+
+
+def parse_din_fmt_test():
+    """parse_din_fmt_test (fixed-offset plan with the strptime results)"""
+    # pylint: disable=protected-access
+    print(proprietdin._compile_din_fmt("IMG_%Y%m%d_%H%M%S"))
+    print(proprietdin._compile_din_fmt("100%%_%Y%m%d"),
+          proprietdin._compile_din_fmt("%Y-%j"),
+          proprietdin._compile_din_fmt("%Y%m%Y"))
+    din_fmt = "IMG_%Y%m%d_%H%M%S"
+    for name in ("IMG_20210105_010203", "IMG_2021115_010203",
+                 "img_20210105_010203", "VID_20210105_010203",
+                 "IMG_20211305_010203", "IMG_20210230_010203"):
+        try:
+            date = proprietdin.parse_din_fmt(name, din_fmt)
+            print(name, date,
+                  date == datetime.datetime.strptime(name, din_fmt))
+        except ValueError:
+            print(name, "rejected")
+
+
+def proprietary_engine_test():
+    """proprietary_engine_test (registration, priority and prefix dispatch)"""
+    # pylint: disable=protected-access, too-few-public-methods
+    builtins = [type(x) for x in proprietdin._DISPATCHER.engine.conventions]
+    dispatcher = proprietdin._Dispatcher()
+    for prop_class in builtins:
+        dispatcher.register(prop_class)
+    names = ["IMG_20210105_010203.jpg", "IMG_20210105 x.jpg",
+             "CAM_20210105_010203.jpg", "Shot 2021-01-02 10.11.12.png",
+             "Shot 2021-13-02 10.11.12.png", "VID_20210105_010203.mp4",
+             "notes.txt"]
+    # Classes defined here are registered in the temporary dispatcher
+    with mock.patch.object(proprietdin, "_DISPATCHER", dispatcher):
+
+        class Camera(proprietdin.PatternProprietary):
+            """Camera test convention"""
+            _tail = "Camera"
+            _din_fmt = "CAM_%Y%m%d_%H%M%S"
+
+        class ShortImg(proprietdin.PatternProprietary):
+            """Convention overlapping GooglePhotos (lower priority)"""
+            _tail = "Short"
+            _din_fmt = "IMG_%Y%m%d"
+
+        class Shot(proprietdin.BaseProprietary):
+            """Convention checked by its '_dispatch_prefix' only"""
+            _dispatch_prefix = "Shot "
+            _tail = "Shot"
+            _din_fmt = "Shot %Y-%m-%d %H.%M.%S"
+
+            @staticmethod
+            def _conditions_ok(file: Path) -> bool:
+                return file.name.startswith("Shot ")
+
+            @staticmethod
+            def _clean_datename(file: Path) -> str:
+                return file.name[:24]
+
+        engine = dispatcher.engine
+        conventions_list = engine.conventions
+        registered = [type(x) for x in conventions_list[len(builtins):]]
+        print(registered == [Camera, ShortImg, Shot])
+        for name in names:
+            convention, date = proprietdin.match_proprietary_din(Path(name))
+            linear = next(((x, x.get_din(Path(name)))
+                           for x in conventions_list
+                           if x.get_din(Path(name)).year != 1),
+                          (None, datetime.datetime(1, 1, 1)))
+            print(name, type(convention).__name__, date,
+                  (type(linear[0]), linear[1]) == (type(convention), date))
+        # Shot is only dispatched by prefix, the rest by the combined regex
+        print(sorted(type(conventions_list[x]).__name__
+                     for x in engine._regexes if x >= len(builtins)),
+              len(engine._patterns) > 0)
+    print(proprietdin.match_proprietary_din(Path(names[2]))[0],
+          len(proprietdin._DISPATCHER.engine.conventions) == len(builtins))
+
+
+def proprietary_rename_batch_test():
+    """proprietary_rename_batch_test (dry run, nothing touched on disk)"""
+    files = [Path("IMG_20210105_010203.jpg"), Path("notes.txt"),
+             Path("VID_20210105_010203.mp4"), Path("IMG_20210105_010203.png")]
+    outcomes = proprietdin.rename_proprietary_din_files(files, dry_run=True)
+    for outcome in outcomes:
+        print(outcome.status, outcome.source, "->", outcome.target)
+
+
+def proprietary_rename_rollback_test():
+    """proprietary_rename_rollback_test (run, undo, run again and undo)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = [Path(tmp, x) for x in ("IMG_20210105_010203.jpg",
+                                        "VID_20210105_010204.mp4")]
+        for file in files:
+            file.write_bytes(b"")
+        journal = Path(tmp, "renames.journal")
+        for _ in range(2):
+            renamed = proprietdin.rename_proprietary_din_files(
+                files, journal=journal)
+            restored = filetools.rollback_journal(journal)
+            print([x.status for x in renamed], [x.status for x in restored],
+                  sorted(x.name for x in Path(tmp).glob("*.*")))
+
+
+def _make_tree(base: Path, files: List[str]):
+    """Create the relative <files> (and their folders) in <base>"""
+    for file in files:
+        base.joinpath(file).parent.mkdir(parents=True, exist_ok=True)
+        base.joinpath(file).write_text(file, encoding="utf-8")
+
+
+def folders_tree_test():
+    """folders_tree_test (single scandir pass with name patterns)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        _make_tree(base, ["2021/a/x.jpg", "2021/b/y.JPG", "misc/z.txt",
+                          "2022/c/d/w.nef"])
+        for filter_scan in ((), ("20*",), ("*1",), ("2021/a",)):
+            folders = filetools.get_folders_tree(base, filter_scan)
+            print(filter_scan, [x.relative_to(base).as_posix()
+                                for x in folders])
+        try:
+            filetools.get_folders_tree(base.joinpath("missing"))
+        except ValueError as error:
+            print(str(error).endswith("is not a readable directory"))
+
+
+def files_tree_test():
+    """files_tree_test (streamed folder by folder, extensions filter)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        _make_tree(base, ["a/2.jpg", "a/1.JPG", "a/3.nef", "b/4.jpg"])
+        folders = filetools.get_folders_tree(base)
+        files = filetools.iter_files_tree(folders, ("jpg",))
+        print(next(files).relative_to(base), len(list(files)))
+        print([x.name for x in filetools.get_files_tree(folders, ("jpg",),
+                                                        upper_lower=False)])
+
+
+def parallel_walker_test():
+    """parallel_walker_test (same output as filetools, depth and cancel)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        _make_tree(base, ["2021/a/x.jpg", "2021/b/c/y.jpg", "misc/z.txt"])
+        folders = walker.get_folders_tree(base, workers=4)
+        files = filetools.get_files_tree(folders, ("jpg",))
+        print(folders == filetools.get_folders_tree(base),
+              walker.get_files_tree(folders, ("jpg",)) == files)
+        print([x.relative_to(base).as_posix() for x in
+               walker.get_folders_tree(base, ("20*",), max_depth=2)])
+        try:
+            walker.get_folders_tree(base, cancel=lambda: True)
+        except CancelledError:
+            print("walk cancelled")
+
+
+def tree_snapshot_test():
+    """tree_snapshot_test (changes between scans of a real tree)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp, "base")
+        _make_tree(base, ["a/1.jpg", "a/2.jpg", "b/3.jpg"])
+        with snapshot.TreeSnapshot(Path(tmp, "tree.db"), base) as tree:
+            print(len(tree.scan().added))
+            base.joinpath("a", "2.jpg").unlink()
+            _make_tree(base, ["b/c/4.jpg"])
+            base.joinpath("b", "3.jpg").write_text("changed", encoding="utf-8")
+            scan = tree.scan(check_files=True)
+            print([[x.relative_to(base).as_posix() for x in changes]
+                   for changes in (scan.added, scan.removed, scan.modified)])
+            print(scan.folders == filetools.get_folders_tree(base))
+
+
+def folders_from_files_test():
+    """folders_from_files_test (in order of appearance, leaf folders)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        _make_tree(base, ["a/b/1.jpg", "a/2.jpg", "c/3.jpg"])
+        files = [base.joinpath(x) for x in ("a/b/1.jpg", "c/3.jpg",
+                                            "a/2.jpg", "a/b/1.jpg")]
+        print([x.relative_to(base).as_posix() for x in
+               filetools.get_folders_from_files(files)])
+        # Files not created yet (e.g. destinations) are not checked
+        files.append(base.joinpath("a", "b", "d", "4.jpg"))
+        print([x.relative_to(base).as_posix() for x in
+               filetools.get_leaf_folders_from_files(files, False)])
+
+
+def name_allocator_test():
+    """name_allocator_test (same names as itername() from one listing)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        _make_tree(base, ["a.jpg", "a-1.jpg", "a-3.jpg", "b"])
+        allocator = filetools.NameAllocator(base)
+        expected = filetools.itername(base.joinpath("a.jpg"))
+        print(allocator.allocate_path(base.joinpath("a.jpg")) == expected)
+        print([allocator.allocate(x) for x in ("a.jpg", "a.jpg", "b", "c")])
+        print(allocator.reserve("d.jpg"), allocator.reserve("d.jpg"),
+              "c" in allocator)
+
+
+def move_files_batch_test():
+    """move_files_batch_test (same device, other device, existing target)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        src, dst = Path(tmp, "src"), Path(tmp, "dst")
+        filetools.replicate_folders_in_path([Path("a")], src)
+        filetools.replicate_folders_in_path([Path("a")], dst)
+        files = [Path("a", f"{x}.jpg") for x in range(4)]
+        for idx, file in enumerate(files):
+            src.joinpath(file).write_bytes(bytes(range(idx + 1)) * 1000)
+
+        report = filetools.move_files2destination_batch(files[:2], src, dst)
+        print(report.moved, report.failed, report.renamed, report.copied)
+
+        def other_device(folder, devices):
+            return devices.setdefault(folder, 1 if src in folder.parents
+                                      else 2)
+        with mock.patch.object(filetools, "_device", other_device):
+            report = filetools.move_files2destination_batch([files[2]], src,
+                                                            dst)
+        print(report.moved, report.copied, report.bytes_copied)
+        assert dst.joinpath(files[2]).read_bytes() == bytes(range(3)) * 1000
+
+        # target created after the checks is never overwritten
+        with mock.patch.object(filetools, "_check_moves"):
+            dst.joinpath(files[3]).write_bytes(b"keep")
+            report = filetools.move_files2destination_batch([files[3]], src,
+                                                            dst)
+        print(report.moved, [x[0] for x in report.failed])
+        assert dst.joinpath(files[3]).read_bytes() == b"keep"
+        assert src.joinpath(files[3]).exists()
+
+
+def move_by_copy_short_copy_test():
+    """move_by_copy_short_copy_test (kernel copy returning 0 bytes)"""
+    # pylint: disable=protected-access
+    with tempfile.TemporaryDirectory() as tmp:
+        source, target = Path(tmp, "source.bin"), Path(tmp, "target.bin")
+        source.write_bytes(os.urandom(100_000))
+        with mock.patch("os.copy_file_range", return_value=0, create=True):
+            print(filetools._move_by_copy(source, target), source.exists())
+        target.rename(source)
+        with mock.patch.object(filetools, "_copy_data", return_value=0):
+            try:
+                filetools._move_by_copy(source, target)
+            except OSError as error:
+                print("kept:", source.exists(), target.exists(), error)
+
+
+def replicate_folders_test():
+    """replicate_folders_test (created folders, sequential and parallel)"""
+    rel_folders = [Path(x) for x in ("a/b/c", "a/b", "a/d", "e", "a/b/c")]
+    for workers in (1, 4):
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            base.joinpath("e").mkdir()
+            created = filetools.replicate_folders_in_path(rel_folders, base,
+                                                          workers=workers)
+            print(workers, [x.as_posix() for x in created],
+                  all(base.joinpath(x).is_dir() for x in rel_folders))
+
+
+def file_checksums_test():
+    """file_checksums_test (one pass, read and mmap modes, empty file)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        data = bytes(range(256)) * 5000
+        for name, content in (("data.bin", data), ("empty.bin", b"")):
+            file = Path(tmp, name)
+            file.write_bytes(content)
+            expected = {x: hashlib.new(x, content).hexdigest()
+                        for x in ("md5", "sha256")}
+            print(name, all(
+                ostools.file_checksums(file, ("md5", "sha256"), buffer,
+                                       use_mmap) == expected
+                for buffer in (1000, 2**20) for use_mmap in (False, True)),
+                ostools.md5checksum(file) == expected["md5"])
+
+
+def file_times_test():
+    """file_times_test (nanosecond set_file_times and single-stat reads)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        file = Path(tmp, "file.jpg")
+        file.write_bytes(b"")
+        date = datetime.datetime(2019, 5, 4, 3, 2, 1, 123456)
+        ostools.set_file_times(file, mtime=date)
+        ostools.set_file_times(file, atime=1_500_000_000_123_456_789)
+        stat = os.stat(file)
+        print(stat.st_mtime_ns == ostools.datetime2ns(date),
+              stat.st_atime_ns == 1_500_000_000_123_456_789)
+        times = ostools.stat_times([file, Path(tmp, "missing.jpg")])
+        modify = ostools.get_file_modify_date(file)
+        print(times[0] is not None and times[0].modify == modify, times[1])
+        with os.scandir(tmp) as entries:
+            print(ostools.stat_times(entries) == times[:1])
+        print(len(ostools.set_files_times([(Path(tmp, "missing.jpg"),
+                                            date, None)])))
+
+
+def hash_cache_test():
+    """hash_cache_test (cached keys, modified and just written files)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp, "files")
+        _make_tree(base, ["a.jpg", "b.jpg", "new.jpg"])
+        files = [base.joinpath(x) for x in ("a.jpg", "b.jpg", "new.jpg")]
+        for file in files[:2]:
+            ostools.set_file_times(file, mtime=1_500_000_000 * 10**9)
+        with hashcache.HashCache(Path(tmp, "hashes.db")) as cache:
+            for _ in range(2):
+                result = hashcache.hash_files(files, cache=cache, workers=1)
+                print(result.cached, result.hashed, len(cache))
+            files[0].write_text("changed", encoding="utf-8")
+            ostools.set_file_times(files[0], mtime=1_600_000_000 * 10**9)
+            result = hashcache.hash_files(files, ("md5", "sha1"), cache,
+                                          workers=2)
+            expected = ostools.file_checksums(files[0], ("md5", "sha1"))
+            print(result.cached, result.hashed,
+                  result.digests[files[0]] == expected)
+
+
+def find_duplicates_test():
+    """find_duplicates_test (partial collisions, hard links, bytes read)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        head = b"x" * 1000
+        contents = {"a.bin": head + b"1" + head, "b.bin": head + b"1" + head,
+                    "c.bin": head + b"2" + head, "d.bin": b"unique",
+                    "e.bin": b"", "f.bin": b"", "h.bin": head * 10}
+        for name, content in contents.items():
+            base.joinpath(name).write_bytes(content)
+        os.link(base.joinpath("d.bin"), base.joinpath("g.bin"))
+        files = sorted(base.iterdir())
+        report = duplicates.find_duplicates(files, partial_size=100)
+        print([[x.name for x in group] for group in report.groups],
+              report.bytes_read, report.bytes_avoided)
+        # The hard link g.bin is skipped (neither reported nor counted)
+        counted = report.bytes_read + report.bytes_avoided
+        print(base.joinpath("g.bin") in files,
+              counted == sum(map(len, contents.values())))
+        # All the files of the same size collide in the partial hashes, so
+        # they are read more than once (negative bytes avoided)
+        report = duplicates.find_duplicates(files[:3], partial_size=100)
+        print(report.bytes_read, report.bytes_avoided)
+
+
+def din_mtimes_test():
+    """din_mtimes_test (idempotent runs, FAT precision and failed files)"""
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        _make_tree(base, ["20210102-201005.jpg", "a/20210102-201006(DTR).jpg",
+                          "a/b/x ++2019-05-04+03-02-01++.jpg", "a/b/none.jpg",
+                          "IMG_20200101_101010.jpg", "20210102-201005.txt"])
+        kdin = base.joinpath("20210102-201005.jpg")
+        for dry_run in (True, False, False):
+            print(dinmtime.apply_din_mtimes(base, extensions=("jpg",),
+                                            workers=2, batch_size=2,
+                                            dry_run=dry_run))
+        print(kdin.stat().st_mtime_ns == ostools.datetime2ns(
+            conventions.get_file_kdin(kdin)))
+        # One second off (FAT rounding) is unchanged, three are changed
+        for offset in (10**9, 3 * 10**9):
+            mtime_ns = kdin.stat().st_mtime_ns + offset
+            ostools.set_file_times(kdin, mtime=mtime_ns)
+            print(dinmtime.apply_din_mtimes(base, proprietary=False,
+                                            trkdin=True)[:4])
+        with mock.patch.object(ostools, "set_file_times",
+                               side_effect=OverflowError("out of range")):
+            os.utime(kdin, ns=(0, 0))
+            failed = dinmtime.apply_din_mtimes(base).failed
+            print(failed == {kdin: "OverflowError: out of range"})
+
+
+def folder_watcher_test():
+    """folder_watcher_test (Linux only)"""
+    # pylint: disable=protected-access
+    if not sys.platform.startswith("linux"):
+        return
+
+    def next_batch(watch: watcher.FolderWatcher) -> list:
+        deadline = time.monotonic() + 0.5
+        batch = next(watch.batches(lambda: time.monotonic() > deadline), [])
+        return sorted(x.relative_to(watch.base_folder) for x in batch)
+
+    def no_watches(*args):  # pylint: disable=unused-argument
+        ctypes.set_errno(errno.ENOSPC)
+        return -1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base, outside = Path(tmp, "base"), Path(tmp, "outside")
+        base.joinpath("sub").mkdir(parents=True)
+        with watcher.FolderWatcher(base, debounce=0.05) as watch:
+            base.joinpath("sub", "a.jpg").write_bytes(b"a")
+            base.joinpath("new").mkdir()
+            base.joinpath("new", "b.jpg").write_bytes(b"b")
+            print(next_batch(watch))
+
+            # moved out of the tree: not watched and pending files dropped
+            base.joinpath("sub", "c.jpg").write_bytes(b"c")
+            base.joinpath("sub").rename(outside)
+            outside.joinpath("d.jpg").write_bytes(b"d")
+            base.joinpath("e.jpg").write_bytes(b"e")
+            print(next_batch(watch), sorted(watch._folders.values()) == [
+                str(base), str(base.joinpath("new"))])
+
+            with mock.patch.object(watch._libc, "inotify_add_watch",
+                                   no_watches):
+                base.joinpath("full").mkdir()
+                try:
+                    next_batch(watch)
+                except OSError as error:
+                    print("limit:", error.errno == errno.ENOSPC)
+
+
+def aio_configure_test():
+    """aio_configure_test (calls in flight when the runner is replaced)"""
+    async def main():
+        aio.configure(max_workers=2, limit=4)
+        calls = [asyncio.ensure_future(aio.get_runner().run(time.sleep, 0.01))
+                 for _ in range(40)]
+        await asyncio.sleep(0.02)
+        aio.configure(max_workers=4)
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        print("in flight calls run:", results.count(None), "of", len(calls))
+        with tempfile.TemporaryDirectory() as tmp:
+            file = Path(tmp, "file.bin")
+            file.write_bytes(b"kjmaro")
+            await aio.set_file_times(file, 10**9, 2 * 10**9)
+            print(await aio.md5checksum(file), os.stat(file).st_mtime_ns)
+        aio.shutdown()
+
+    asyncio.run(main())
+
+
+def aio_runner_test():
+    """aio_runner_test (map, backpressure, cancel and shutdown)"""
+    # pylint: disable=too-many-statements
+    running: List[int] = [0, 0]  # current, peak
+    lock = threading.Lock()
+
+    def work(item: int) -> int:
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        time.sleep(0.01 * (item % 3))
+        with lock:
+            running[0] -= 1
+        if item < 0:
+            raise ValueError(f"bad item {item}")
+        return item * 2
+
+    async def main():
+        errors: list = []
+        asyncio.get_running_loop().set_exception_handler(
+            lambda _, context: errors.append(context))
+        runner = aio.FileOpsRunner(max_workers=4, limit=2)
+        print(await runner.map(work, range(10)), "peak:", running[1])
+        try:
+            await runner.map(work, [1, 2, -3, 4])
+        except ValueError as error:
+            print("map error:", error)
+        # Failures finishing together: one is raised, all are retrieved
+        try:
+            await runner.map(work, [-3, -6, -9, -12])
+        except ValueError as error:
+            expected = [f"bad item {x}" for x in (-3, -6, -9, -12)]
+            print("map error:", str(error) in expected)
+        gc.collect()
+        await asyncio.sleep(0.05)
+        gc.collect()
+        print("unretrieved errors:", len(errors))
+
+        # A call cancelled while waiting for a slot never runs
+        gate = threading.Event()
+        first = asyncio.ensure_future(runner.run(gate.wait, 5))
+        second = asyncio.ensure_future(runner.run(gate.wait, 5))
+        queued = asyncio.ensure_future(runner.run(work, 100))
+        await asyncio.sleep(0.05)
+        queued.cancel()
+        gate.set()
+        # Both slots are back: two calls wait for each other at once
+        barrier = threading.Barrier(2, timeout=5)
+        both = await asyncio.gather(*[runner.run(barrier.wait)
+                                      for _ in range(2)])
+        print(await first, await second, queued.cancelled(), sorted(both),
+              running[1])
+        runner.shutdown()
+
+        # Shutdown cancelling the calls not started yet
+        runner = aio.FileOpsRunner(max_workers=1, limit=3)
+        gate.clear()
+        calls = [asyncio.ensure_future(runner.run(gate.wait, 5))
+                 for _ in range(5)]
+        await asyncio.sleep(0.05)
+        runner.shutdown(wait=False, cancel_futures=True)
+        gate.set()
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        print([type(x).__name__ for x in results])
+        try:
+            await runner.run(work, 1)
+        except RuntimeError as error:
+            print("after shutdown:", error)
+
+    asyncio.run(main())
+
+
 if __name__ == "__main__":
     folder_naming_test()
+    folder_naming_batch_test()
     file_date_in_name_test()
     file_date_in_name_edition_test()
+    file_date_in_name_batch_test()
+    classify_filename_test()
+    parser_cache_test()
+    folder_date_index_test()
+    folder_date_index_scale_test()
+    ekdin2kdin_renames_test()
+    proprietary_kdin_test()
+    parse_din_fmt_test()
+    proprietary_engine_test()
+    proprietary_rename_batch_test()
+    proprietary_rename_rollback_test()
+    folders_tree_test()
+    files_tree_test()
+    parallel_walker_test()
+    tree_snapshot_test()
+    folders_from_files_test()
+    name_allocator_test()
+    move_files_batch_test()
+    move_by_copy_short_copy_test()
+    replicate_folders_test()
+    file_checksums_test()
+    file_times_test()
+    hash_cache_test()
+    find_duplicates_test()
+    din_mtimes_test()
+    folder_watcher_test()
+    aio_configure_test()
+    aio_runner_test()